@@ -4,9 +4,14 @@ Add comprehensive, detailed documents to demonstrate the AI Search Engine's capa
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from datetime import datetime
 
+# One keep-alive session reused for every upload instead of a new connection per POST
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
 def add_document(title, content, category, difficulty, tags):
     """Add a document to the search engine"""
     doc = {
@@ -20,7 +25,7 @@ def add_document(title, content, category, difficulty, tags):
     }
     
     try:
-        response = requests.post("http://localhost:5000/api/document/add", json=doc)
+        response = SESSION.post("http://localhost:5000/api/document/add", json=doc)
         if response.status_code == 200:
             print(f"✅ Added: {title}")
             return True
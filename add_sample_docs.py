@@ -1,8 +1,10 @@
-import requests
-import json
+import asyncio
+import logging
+import sys
 
-# API endpoint
-API_URL = "http://localhost:5000/api/documents/batch"
+from ingest_utils import install_uvloop, make_session, post_in_batches, start_logging, warm_up
+
+log = logging.getLogger(__name__)
 
 # Sample documents about various tech topics
 documents = [
@@ -80,21 +82,31 @@ documents = [
     }
 ]
 
-# Send batch request
-try:
-    print("Adding sample documents...")
-    response = requests.post(API_URL, json={"documents": documents}, timeout=30)
+async def run(session):
+    """Add the sample documents in batches posted concurrently."""
+    log.info("Adding sample documents...")
+    results = await post_in_batches(session, documents)
     
-    if response.status_code == 201:
-        result = response.json()
-        print(f"✅ Successfully added {result['total_added']} documents!")
-        print("\nDocuments added:")
+    total_added = 0
+    for result in results:
+        total_added += result['total_added']
         for doc in result['added_documents']:
-            print(f"  - {doc['title']}")
-    else:
-        print(f"❌ Error: {response.status_code}")
-        print(response.text)
-        
-except Exception as e:
-    print(f"❌ Error: {e}")
+            log.info(f"  - {doc['title']}")
+    log.info(f"✅ Successfully added {total_added} documents!")
+    return total_added
+
+async def main():
+    async with make_session() as session:
+        await warm_up(session)
+        await run(session)
 
+if __name__ == "__main__":
+    listener = start_logging()
+    install_uvloop()
+    try:
+        asyncio.run(main())
+    except Exception as e:
+        log.error(f"❌ Ingestion aborted: {e}")
+        sys.exit(1)
+    finally:
+        listener.stop()
@@ -19,6 +19,14 @@ def create_app():
     """Create and configure the Flask application."""
     app = Flask(__name__)
     
+    # Serialize JSON responses with orjson
+    from app.json_provider import OrjsonProvider
+    app.json = OrjsonProvider(app)
+    
+    # Accept gzip-compressed request bodies from ingestion clients
+    from app.utils.gzip_request import GzipRequestMiddleware
+    app.wsgi_app = GzipRequestMiddleware(app.wsgi_app)
+    
     # Enable CORS for frontend (allow all origins for now, can be restricted via env)
     cors_origins = os.getenv("CORS_ORIGINS")
     if cors_origins:
@@ -36,15 +44,27 @@ def create_app():
     app.config['EMBEDDING_MODEL'] = os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
     app.config['CACHE_TTL'] = int(os.getenv('CACHE_TTL', '3600'))
     
+    # Cache GET responses in Redis when it is reachable
+    from app.utils.response_cache import init_response_cache
+    init_response_cache(app)
+    
     # Initialize services
     from app.models.database import Database
     from app.services.semantic_search import SemanticSearchService
     from app.services.keyword_search import KeywordSearchService
     from app.services.hybrid_search import HybridSearchService
+    from app.services.cache_service import CacheService
     
     # Initialize database
     db = Database(app.config['MONGODB_URI'])
     
+    # Initialize the document cache; search still works without Redis
+    try:
+        cache_service = CacheService(app.config['REDIS_URL'], app.config['CACHE_TTL'])
+    except Exception as e:
+        logger.warning(f"Cache service disabled, Redis unavailable: {e}")
+        cache_service = None
+    
     # Initialize search services
     semantic_service = SemanticSearchService(
         model_name=app.config['EMBEDDING_MODEL']
@@ -58,8 +78,8 @@ def create_app():
     from app.routes.health import health_bp, init_health_services
     
     # Initialize route services
-    init_search_services(app)
-    init_document_services(db, hybrid_service)
+    init_search_services(db, hybrid_service, cache_service)
+    init_document_services(db, hybrid_service, cache_service)
     init_health_services(db)
     
     app.register_blueprint(search_bp, url_prefix='/api')
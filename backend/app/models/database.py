@@ -1,46 +1,166 @@
-from pymongo import MongoClient
-from bson import ObjectId
-from datetime import datetime
+from pymongo import MongoClient, ASCENDING, DESCENDING, TEXT, ReturnDocument
+from pymongo.errors import PyMongoError
+from bson import Binary, ObjectId
+from datetime import datetime, timezone
 import logging
+import os
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Fail fast when MongoDB is unreachable instead of blocking for 30s
+SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '500'))
+CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', '500'))
+
+# Connection pool sizing; a warm minimum pool avoids handshakes on first requests
+MAX_POOL_SIZE = int(os.getenv('MONGO_POOL', '200'))
+MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL', '16'))
+# zstd needs the zstandard package; pymongo skips any compressor it cannot load
+COMPRESSORS = os.getenv('MONGO_COMPRESSORS', 'zstd,zlib')
+
+def utc_now():
+    """Current time as an aware UTC datetime (replaces deprecated utcnow)."""
+    return datetime.now(timezone.utc)
+
+def to_object_id(doc_id):
+    """Convert a document id to an ObjectId, or None if it is malformed."""
+    if isinstance(doc_id, ObjectId):
+        return doc_id
+    if not ObjectId.is_valid(doc_id):
+        return None
+    return ObjectId(doc_id)
+
+def new_document(title, content, metadata, now, doc_id=None):
+    """Build the stored form of a document, ready for insert."""
+    doc = {
+        'title': title,
+        'content': content,
+        'metadata': metadata or {},
+        'created_at': now,
+        'updated_at': now
+    }
+    if doc_id is not None:
+        doc['_id'] = to_object_id(doc_id)
+    return doc
+
 class Database:
     """Database connection and operations."""
     
     def __init__(self, mongodb_uri):
-        self.client = MongoClient(mongodb_uri)
+        self.client = MongoClient(
+            mongodb_uri,
+            serverSelectionTimeoutMS=SERVER_SELECTION_TIMEOUT_MS,
+            connectTimeoutMS=CONNECT_TIMEOUT_MS,
+            maxPoolSize=MAX_POOL_SIZE,
+            minPoolSize=MIN_POOL_SIZE,
+            compressors=COMPRESSORS,
+            appname='ai-search-engine'
+        )
         self.db = self.client.search_engine
         self.documents = self.db.documents
         self.embeddings = self.db.embeddings
+        self._ensure_indexes()
+    
+    def _ensure_indexes(self):
+        """Create the indexes queries rely on; a no-op when they already exist."""
+        # One failure (e.g. a conflicting existing text index) must not skip the rest
+        specs = (
+            (self.documents, [('title', TEXT), ('content', TEXT)], {
+                'weights': {'title': 3, 'content': 1},
+                'default_language': 'english',
+                'name': 'doc_text_idx'
+            }),
+            (self.documents, [('created_at', DESCENDING)], {'name': 'created_at_idx'}),
+            (self.embeddings, [('doc_id', ASCENDING)], {'unique': True, 'name': 'doc_id_idx'})
+        )
+        for collection, keys, options in specs:
+            try:
+                collection.create_index(keys, **options)
+            except PyMongoError as e:
+                logger.warning("Could not ensure MongoDB index %s: %s", options['name'], e)
         
+    def ping(self):
+        """Check the server responds, without reading any documents."""
+        return self.client.admin.command('ping').get('ok') == 1.0
+    
     def add_document(self, title, content, metadata=None):
         """Add a new document to the database."""
         try:
-            doc = {
-                'title': title,
-                'content': content,
-                'metadata': metadata or {},
-                'created_at': datetime.utcnow(),
-                'updated_at': datetime.utcnow()
-            }
+            doc = new_document(title, content, metadata, utc_now())
             result = self.documents.insert_one(doc)
-            logger.info(f"Added document with ID: {result.inserted_id}")
+            logger.info("Added document with ID: %s", result.inserted_id)
             return str(result.inserted_id)
         except Exception as e:
-            logger.error(f"Error adding document: {e}")
+            logger.error("Error adding document: %s", e)
+            raise
+    
+    def add_documents_many(self, docs, doc_ids=None):
+        """Add several documents in a single insert_many round-trip.
+        
+        ``doc_ids`` may carry ids generated up front with ``ObjectId()`` so
+        callers can index the documents while the insert is in flight.
+        """
+        try:
+            now = utc_now()
+            if doc_ids is None:
+                doc_ids = [None] * len(docs)
+            payload = [
+                new_document(doc['title'], doc['content'], doc.get('metadata'), now, doc_id)
+                for doc, doc_id in zip(docs, doc_ids)
+            ]
+            if not payload:
+                return []
+            result = self.documents.insert_many(payload, ordered=False)
+            logger.info(
+                "Added %d documents in one batch, first ID: %s",
+                len(result.inserted_ids), result.inserted_ids[0]
+            )
+            return [str(doc_id) for doc_id in result.inserted_ids]
+        except Exception as e:
+            logger.error("Error adding documents batch: %s", e)
             raise
     
     def get_document(self, doc_id):
-        """Get a document by ID."""
+        """Get a document by ID; None if it does not exist, raises if MongoDB fails."""
+        oid = to_object_id(doc_id)
+        if oid is None:
+            return None
         try:
-            doc = self.documents.find_one({'_id': ObjectId(doc_id)})
+            doc = self.documents.find_one({'_id': oid})
             if doc:
                 doc['_id'] = str(doc['_id'])
             return doc
         except Exception as e:
-            logger.error(f"Error getting document {doc_id}: {e}")
-            return None
+            # Raise rather than report "not found", so cached views can serve stale data
+            logger.error("Error getting document %s: %s", doc_id, e)
+            raise
+    
+    def get_documents_by_ids(self, doc_ids, fields=None):
+        """Get several documents in one query, as a dict keyed by string id.
+        
+        Malformed and missing ids are left out; callers re-order by their own
+        id list since ``$in`` does not preserve it. ``fields`` limits the
+        returned fields to those listed (``_id`` is always included).
+        """
+        oids = [oid for oid in map(to_object_id, doc_ids) if oid is not None]
+        if not oids:
+            return {}
+        try:
+            docs = {}
+            # $match leads so the _id index is used before anything else runs
+            pipeline = [{'$match': {'_id': {'$in': oids}}}]
+            if fields:
+                pipeline.append({'$project': dict.fromkeys(fields, 1)})
+            # Ask for every match in the first batch to avoid a getMore round trip
+            cursor = self.documents.aggregate(pipeline, batchSize=len(oids))
+            for doc in cursor:
+                doc['_id'] = str(doc['_id'])
+                docs[doc['_id']] = doc
+            return docs
+        except Exception as e:
+            # An empty dict would read as "every hit was deleted" and get cached
+            logger.error("Error getting documents by ids: %s", e)
+            raise
     
     def get_all_documents(self, limit=None):
         """Get all documents."""
@@ -55,13 +175,60 @@ class Database:
                 docs.append(doc)
             return docs
         except Exception as e:
-            logger.error(f"Error getting all documents: {e}")
+            logger.error("Error getting all documents: %s", e)
             return []
     
+    def iter_doc_contents(self, batch_size=500):
+        """Stream (id, content) pairs without loading every document at once."""
+        cursor = self.documents.find({}, {'content': 1}).batch_size(batch_size)
+        for doc in cursor:
+            yield str(doc['_id']), doc['content']
+    
+    def get_documents_page(self, skip, limit):
+        """Get one page of documents, paginated server-side."""
+        try:
+            cursor = self.documents.find().skip(skip).limit(limit)
+            
+            docs = []
+            for doc in cursor:
+                doc['_id'] = str(doc['_id'])
+                docs.append(doc)
+            return docs
+        except Exception as e:
+            logger.error("Error getting documents page: %s", e)
+            raise
+    
+    def count_documents(self):
+        """Get the total number of documents from collection metadata."""
+        try:
+            return self.documents.estimated_document_count()
+        except Exception as e:
+            logger.error("Error counting documents: %s", e)
+            raise
+    
+    def get_content_stats(self):
+        """Count documents and total content length server-side in one aggregation."""
+        try:
+            cursor = self.documents.aggregate([
+                {'$group': {
+                    '_id': None,
+                    'total_documents': {'$sum': 1},
+                    'total_content_length': {'$sum': {'$strLenCP': '$content'}}
+                }},
+                {'$project': {'_id': 0}}
+            ])
+            return next(cursor, None) or {'total_documents': 0, 'total_content_length': 0}
+        except Exception as e:
+            logger.error("Error computing content stats: %s", e)
+            raise
+    
     def update_document(self, doc_id, title=None, content=None, metadata=None):
-        """Update a document."""
+        """Update a document; returns the updated document, or None if missing."""
+        oid = to_object_id(doc_id)
+        if oid is None:
+            return None
         try:
-            update_data = {'updated_at': datetime.utcnow()}
+            update_data = {'updated_at': utc_now()}
             if title is not None:
                 update_data['title'] = title
             if content is not None:
@@ -69,23 +236,44 @@ class Database:
             if metadata is not None:
                 update_data['metadata'] = metadata
             
-            result = self.documents.update_one(
-                {'_id': ObjectId(doc_id)},
-                {'$set': update_data}
+            doc = self.documents.find_one_and_update(
+                {'_id': oid},
+                {'$set': update_data},
+                return_document=ReturnDocument.AFTER
             )
-            return result.modified_count > 0
+            if doc:
+                doc['_id'] = str(doc['_id'])
+            return doc
         except Exception as e:
-            logger.error(f"Error updating document {doc_id}: {e}")
-            return False
+            logger.error("Error updating document %s: %s", doc_id, e)
+            raise
     
     def delete_document(self, doc_id):
-        """Delete a document."""
+        """Delete a document; returns the deleted document, or None if missing."""
+        oid = to_object_id(doc_id)
+        if oid is None:
+            return None
         try:
-            result = self.documents.delete_one({'_id': ObjectId(doc_id)})
-            return result.deleted_count > 0
+            doc = self.documents.find_one_and_delete({'_id': oid})
+            if doc:
+                doc['_id'] = str(doc['_id'])
+            return doc
+        except Exception as e:
+            logger.error("Error deleting document %s: %s", doc_id, e)
+            raise
+    
+    def clear_documents(self):
+        """Delete every document server-side in one call; returns how many were removed.
+        
+        Unlike dropping the collection, this keeps its indexes in place.
+        """
+        try:
+            result = self.documents.delete_many({})
+            logger.info("Deleted %d documents", result.deleted_count)
+            return result.deleted_count
         except Exception as e:
-            logger.error(f"Error deleting document {doc_id}: {e}")
-            return False
+            logger.error("Error clearing documents: %s", e)
+            raise
     
     def search_documents(self, query, limit=10):
         """Basic text search in documents."""
@@ -101,43 +289,85 @@ class Database:
                 docs.append(doc)
             return docs
         except Exception as e:
-            logger.error(f"Error searching documents: {e}")
+            logger.error("Error searching documents: %s", e)
             return []
     
+    @staticmethod
+    def _encode_embedding(embedding):
+        """Pack an embedding as raw float32 bytes."""
+        arr = np.ascontiguousarray(embedding, dtype=np.float32)
+        return Binary(arr.tobytes()), arr.size
+    
+    @staticmethod
+    def _decode_embedding(stored):
+        """Unpack a stored embedding, accepting the legacy list-of-floats form."""
+        if isinstance(stored, (bytes, Binary)):
+            return np.frombuffer(stored, dtype=np.float32)
+        return np.asarray(stored, dtype=np.float32)
+    
     def add_embedding(self, doc_id, embedding):
         """Add or update document embedding."""
+        oid = to_object_id(doc_id)
+        if oid is None:
+            logger.error("Invalid document id for embedding: %s", doc_id)
+            return
         try:
+            blob, dim = self._encode_embedding(embedding)
             self.embeddings.update_one(
-                {'doc_id': ObjectId(doc_id)},
-                {'$set': {'embedding': embedding, 'updated_at': datetime.utcnow()}},
+                {'doc_id': oid},
+                {'$set': {
+                    'embedding': blob,
+                    'dim': dim,
+                    'dtype': 'f4',
+                    'updated_at': utc_now()
+                }},
                 upsert=True
             )
         except Exception as e:
-            logger.error(f"Error adding embedding for document {doc_id}: {e}")
+            logger.error("Error adding embedding for document %s: %s", doc_id, e)
     
     def get_embedding(self, doc_id):
-        """Get document embedding."""
+        """Get document embedding as a float32 array."""
+        oid = to_object_id(doc_id)
+        if oid is None:
+            return None
         try:
-            result = self.embeddings.find_one({'doc_id': ObjectId(doc_id)})
-            return result['embedding'] if result else None
+            result = self.embeddings.find_one({'doc_id': oid})
+            if not result:
+                return None
+            
+            embedding = self._decode_embedding(result['embedding'])
+            if isinstance(result['embedding'], list):
+                # Upgrade legacy list-form embeddings on first read
+                self.add_embedding(oid, embedding)
+            return embedding
         except Exception as e:
-            logger.error(f"Error getting embedding for document {doc_id}: {e}")
+            logger.error("Error getting embedding for document %s: %s", doc_id, e)
             return None
     
     def get_all_embeddings(self):
-        """Get all document embeddings."""
+        """Get all document embeddings.
+        
+        Returns a list of document ids and a float32 matrix whose rows are
+        the matching embeddings.
+        """
         try:
-            cursor = self.embeddings.find()
-            embeddings = []
-            for doc in cursor:
-                embeddings.append({
-                    'doc_id': str(doc['doc_id']),
-                    'embedding': doc['embedding']
-                })
-            return embeddings
+            doc_ids = []
+            rows = []
+            for doc in self.embeddings.find({}, {'doc_id': 1, 'embedding': 1}):
+                doc_ids.append(str(doc['doc_id']))
+                rows.append(self._decode_embedding(doc['embedding']))
+            
+            if not rows:
+                return [], np.empty((0, 0), dtype=np.float32)
+            
+            matrix = np.empty((len(rows), rows[0].size), dtype=np.float32)
+            for i, row in enumerate(rows):
+                matrix[i] = row
+            return doc_ids, matrix
         except Exception as e:
-            logger.error(f"Error getting all embeddings: {e}")
-            return []
+            logger.error("Error getting all embeddings: %s", e)
+            return [], np.empty((0, 0), dtype=np.float32)
     
     def close(self):
         """Close database connection."""
@@ -1,7 +1,12 @@
 from flask import Blueprint, request, jsonify
 import logging
-from ..models.database import Database
+from concurrent.futures import ThreadPoolExecutor
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from ..models.database import Database, to_object_id
 from ..services.hybrid_search import HybridSearchService
+from ..services.cache_service import CacheService
+from ..utils.response_cache import cached, invalidate_response_cache
 
 logger = logging.getLogger(__name__)
 documents_bp = Blueprint('documents', __name__)
@@ -9,12 +14,30 @@ documents_bp = Blueprint('documents', __name__)
 # Initialize services (will be set by app factory)
 database = None
 hybrid_service = None
+cache_service = None
+executor = None
 
-def init_document_services(db, search_service):
+def init_document_services(db, search_service, cache=None):
     """Initialize document services."""
-    global database, hybrid_service
+    global database, hybrid_service, cache_service, executor
     database = db
     hybrid_service = search_service
+    cache_service = cache
+    # A single worker serializes index updates from concurrent requests;
+    # every route that changes the indexes goes through _update_index
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='document-index')
+
+def _update_index(fn, *args):
+    """Run an index mutation on the index worker and wait for it."""
+    return executor.submit(fn, *args).result()
+
+def _invalidate_caches(doc_ids=None):
+    """Drop cached responses and search results after the corpus changed."""
+    invalidate_response_cache()
+    if cache_service:
+        cache_service.invalidate_search_cache()
+        if doc_ids:
+            cache_service.invalidate_documents(doc_ids)
 
 @documents_bp.route('/documents', methods=['POST'])
 def add_document():
@@ -39,9 +62,10 @@ def add_document():
         doc_id = database.add_document(title, content, metadata)
         
         # Add to search index
-        hybrid_service.add_document(doc_id, content)
+        _update_index(hybrid_service.add_document, doc_id, content)
         
-        logger.info(f"Added document: {doc_id}")
+        _invalidate_caches()
+        logger.info("Added document: %s", doc_id)
         
         return jsonify({
             'id': doc_id,
@@ -52,31 +76,36 @@ def add_document():
         }), 201
         
     except Exception as e:
-        logger.error(f"Error adding document: {e}")
+        logger.error("Error adding document: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @documents_bp.route('/documents/<doc_id>', methods=['GET'])
+@cached('normal')
 def get_document(doc_id):
     """Get a specific document."""
+    oid = to_object_id(doc_id)
+    if oid is None:
+        return jsonify({'error': 'Invalid document id'}), 400
+    
     try:
-        doc = database.get_document(doc_id)
+        doc = database.get_document(oid)
         
         if not doc:
             return jsonify({'error': 'Document not found'}), 404
         
-        # Convert datetime objects to ISO format
-        doc['created_at'] = doc['created_at'].isoformat()
-        doc['updated_at'] = doc['updated_at'].isoformat()
-        
         return jsonify(doc)
         
     except Exception as e:
-        logger.error(f"Error getting document {doc_id}: {e}")
+        logger.error("Error getting document %s: %s", doc_id, e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @documents_bp.route('/documents/<doc_id>', methods=['PUT'])
 def update_document(doc_id):
     """Update a document."""
+    oid = to_object_id(doc_id)
+    if oid is None:
+        return jsonify({'error': 'Invalid document id'}), 400
+    
     try:
         data = request.get_json()
         
@@ -87,53 +116,50 @@ def update_document(doc_id):
         content = data.get('content')
         metadata = data.get('metadata')
         
-        # Check if document exists
-        existing_doc = database.get_document(doc_id)
-        if not existing_doc:
-            return jsonify({'error': 'Document not found'}), 404
-        
-        # Update document
-        success = database.update_document(doc_id, title, content, metadata)
+        # Update document; None means it does not exist
+        updated_doc = database.update_document(oid, title, content, metadata)
         
-        if not success:
-            return jsonify({'error': 'Failed to update document'}), 500
+        if not updated_doc:
+            return jsonify({'error': 'Document not found'}), 404
         
         # Update search index if content changed
         if content is not None:
-            hybrid_service.add_document(doc_id, content)
+            _update_index(hybrid_service.add_document, doc_id, content)
         
-        logger.info(f"Updated document: {doc_id}")
+        _invalidate_caches([doc_id])
+        logger.info("Updated document: %s", doc_id)
         
         return jsonify({'message': 'Document updated successfully'})
         
     except Exception as e:
-        logger.error(f"Error updating document {doc_id}: {e}")
+        logger.error("Error updating document %s: %s", doc_id, e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @documents_bp.route('/documents/<doc_id>', methods=['DELETE'])
 def delete_document(doc_id):
     """Delete a document."""
+    oid = to_object_id(doc_id)
+    if oid is None:
+        return jsonify({'error': 'Invalid document id'}), 400
+    
     try:
-        # Check if document exists
-        existing_doc = database.get_document(doc_id)
-        if not existing_doc:
-            return jsonify({'error': 'Document not found'}), 404
+        # Delete document; None means it did not exist
+        deleted_doc = database.delete_document(oid)
         
-        # Delete document
-        success = database.delete_document(doc_id)
-        
-        if not success:
-            return jsonify({'error': 'Failed to delete document'}), 500
+        if not deleted_doc:
+            return jsonify({'error': 'Document not found'}), 404
         
-        logger.info(f"Deleted document: {doc_id}")
+        _invalidate_caches([doc_id])
+        logger.info("Deleted document: %s", doc_id)
         
         return jsonify({'message': 'Document deleted successfully'})
         
     except Exception as e:
-        logger.error(f"Error deleting document {doc_id}: {e}")
+        logger.error("Error deleting document %s: %s", doc_id, e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @documents_bp.route('/documents', methods=['GET'])
+@cached('normal')
 def list_documents():
     """List all documents with pagination."""
     try:
@@ -146,20 +172,9 @@ def list_documents():
         if per_page < 1 or per_page > 100:
             return jsonify({'error': 'Per page must be between 1 and 100'}), 400
         
-        # Get all documents
-        all_docs = database.get_all_documents()
-        
-        # Calculate pagination
-        total_docs = len(all_docs)
-        start_idx = (page - 1) * per_page
-        end_idx = start_idx + per_page
-        
-        paginated_docs = all_docs[start_idx:end_idx]
-        
-        # Convert datetime objects to ISO format
-        for doc in paginated_docs:
-            doc['created_at'] = doc['created_at'].isoformat()
-            doc['updated_at'] = doc['updated_at'].isoformat()
+        # Fetch only the requested page
+        paginated_docs = database.get_documents_page((page - 1) * per_page, per_page)
+        total_docs = database.count_documents()
         
         return jsonify({
             'documents': paginated_docs,
@@ -174,7 +189,7 @@ def list_documents():
     except ValueError as e:
         return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
     except Exception as e:
-        logger.error(f"Error listing documents: {e}")
+        logger.error("Error listing documents: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @documents_bp.route('/documents/batch', methods=['POST'])
@@ -194,9 +209,11 @@ def add_documents_batch():
         if len(documents) > 100:
             return jsonify({'error': 'Maximum 100 documents per batch'}), 400
         
-        added_docs = []
+        valid_docs = []
+        positions = []
         errors = []
         
+        # Validate everything first so the inserts go out in one round-trip
         for i, doc_data in enumerate(documents):
             try:
                 title = doc_data.get('title', '').strip()
@@ -207,23 +224,54 @@ def add_documents_batch():
                     errors.append(f"Document {i}: Title and content are required")
                     continue
                 
-                doc_id = database.add_document(title, content, metadata)
-                added_docs.append({
-                    'id': doc_id,
+                valid_docs.append({
                     'title': title,
                     'content': content,
                     'metadata': metadata
                 })
+                positions.append(i)
                 
             except Exception as e:
                 errors.append(f"Document {i}: {str(e)}")
         
-        # Add all successful documents to search index
-        if added_docs:
-            search_docs = [(doc['id'], doc['content']) for doc in added_docs]
-            hybrid_service.add_documents_batch(search_docs)
+        added_docs = []
+        if valid_docs:
+            # Assign ids up front so encoding can overlap the database insert
+            doc_ids = [str(ObjectId()) for _ in valid_docs]
+            contents = [doc['content'] for doc in valid_docs]
+            encode_future = executor.submit(
+                hybrid_service.semantic_service.encode_documents, contents
+            )
+            inserted = list(range(len(valid_docs)))
+            try:
+                database.add_documents_many(valid_docs, doc_ids)
+            except BulkWriteError as e:
+                # The insert is unordered, so the rest landed; only those get indexed
+                failed = {}
+                for error in e.details.get('writeErrors', []):
+                    failed[error['index']] = error.get('errmsg', 'insert failed')
+                inserted = [i for i in inserted if i not in failed]
+                errors.extend(
+                    f"Document {positions[i]}: {message}" for i, message in failed.items()
+                )
+            except Exception:
+                # Nothing is known to be stored; the encoding result is dropped unread
+                encode_future.cancel()
+                raise
+            
+            if inserted:
+                # Index only stored documents, on the same worker that serializes index updates
+                embeddings = encode_future.result()[inserted]
+                _update_index(
+                    hybrid_service.add_documents_batch,
+                    [(doc_ids[i], contents[i]) for i in inserted],
+                    embeddings
+                )
+                
+                added_docs = [{'id': doc_ids[i], **valid_docs[i]} for i in inserted]
+                _invalidate_caches()
         
-        logger.info(f"Batch added {len(added_docs)} documents")
+        logger.info("Batch added %d documents", len(added_docs))
         
         return jsonify({
             'added_documents': added_docs,
@@ -232,33 +280,28 @@ def add_documents_batch():
         }), 201
         
     except Exception as e:
-        logger.error(f"Error in batch document addition: {e}")
+        logger.error("Error in batch document addition: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @documents_bp.route('/documents/rebuild-index', methods=['POST'])
 def rebuild_search_index():
     """Rebuild the search index from all documents."""
     try:
-        # Get all documents
-        all_docs = database.get_all_documents()
-        
-        if not all_docs:
+        if database.count_documents() == 0:
             return jsonify({'message': 'No documents to index'})
         
-        # Prepare documents for indexing
-        search_docs = [(doc['_id'], doc['content']) for doc in all_docs]
-        
-        # Rebuild index
-        hybrid_service.rebuild_index(search_docs)
+        # Stream documents from MongoDB straight into the index rebuild
+        total_docs = _update_index(hybrid_service.rebuild_index, database.iter_doc_contents())
+        _invalidate_caches()
         
-        logger.info(f"Rebuilt search index with {len(all_docs)} documents")
+        logger.info("Rebuilt search index with %d documents", total_docs)
         
         return jsonify({
             'message': 'Search index rebuilt successfully',
-            'total_documents': len(all_docs)
+            'total_documents': total_docs
         })
         
     except Exception as e:
-        logger.error(f"Error rebuilding search index: {e}")
+        logger.error("Error rebuilding search index: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
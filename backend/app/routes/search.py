@@ -1,38 +1,91 @@
 from flask import Blueprint, request, jsonify, current_app
+from bisect import bisect_right
+from itertools import accumulate
 import logging
 from ..services.hybrid_search import HybridSearchService
-from ..services.semantic_search import SemanticSearchService
-from ..services.keyword_search import KeywordSearchService
+from ..services.cache_service import CacheService
+from ..services.query_context import QueryContext
 from ..models.database import Database
 
 logger = logging.getLogger(__name__)
 search_bp = Blueprint('search', __name__)
 
+# Document fields copied into search results
+RESULT_FIELDS = ('title', 'content', 'metadata', 'created_at', 'updated_at')
+
+# Placeholder suggestion source; in production these would come from query logs
+POPULAR_QUERIES = (
+    'machine learning',
+    'artificial intelligence',
+    'data science',
+    'python programming',
+    'web development'
+)
+
+# Lowercased suggestions joined once, so a lookup is a C-level str.find over one
+# string instead of lowercasing and scanning every entry per keystroke
+_SUGGESTION_SEP = '\0'
+_SUGGESTION_TEXT = _SUGGESTION_SEP.join(q.lower() for q in POPULAR_QUERIES)
+# Start offset of each entry in the joined text, plus a sentinel past the last one
+_SUGGESTION_STARTS = list(accumulate(
+    (len(q) + len(_SUGGESTION_SEP) for q in POPULAR_QUERIES), initial=0
+))
+
 # Initialize services (will be set by app factory)
 hybrid_service = None
 database = None
+cache_service = None
 
-def init_search_services(app):
-    """Initialize search services with app context."""
-    global hybrid_service, database
+def init_search_services(db, search_service, cache=None):
+    """Initialize search services."""
+    global hybrid_service, database, cache_service
+    # Share the app's database pool and index with the document routes
+    database = db
+    hybrid_service = search_service
+    cache_service = cache
+    logger.info("Search services initialized successfully")
+
+def _load_result_documents(doc_ids):
+    """Fetch result documents, from the cache first and MongoDB for the rest."""
+    if cache_service is None:
+        return database.get_documents_by_ids(doc_ids, fields=RESULT_FIELDS)
     
-    try:
-        # Initialize database
-        database = Database(app.config['MONGODB_URI'])
-        
-        # Initialize search services
-        semantic_service = SemanticSearchService(
-            model_name=app.config['EMBEDDING_MODEL']
-        )
-        keyword_service = KeywordSearchService()
-        
-        # Initialize hybrid service
-        hybrid_service = HybridSearchService(semantic_service, keyword_service)
-        
-        logger.info("Search services initialized successfully")
-    except Exception as e:
-        logger.error(f"Error initializing search services: {e}")
-        raise
+    docs, misses = cache_service.get_cached_documents(doc_ids)
+    if misses:
+        fresh = database.get_documents_by_ids(misses, fields=RESULT_FIELDS)
+        cache_service.cache_documents(fresh)
+        docs.update(fresh)
+    return docs
+
+def _match_suggestions(query, limit):
+    """Popular queries containing query, case-insensitively, in list order."""
+    needle = query.lower()
+    if _SUGGESTION_SEP in needle:
+        return []
+    
+    suggestions = []
+    pos = _SUGGESTION_TEXT.find(needle)
+    while pos != -1:
+        entry = bisect_right(_SUGGESTION_STARTS, pos) - 1
+        suggestions.append(POPULAR_QUERIES[entry])
+        # Checked after appending, as before, so a limit below 1 still gets the first match
+        if len(suggestions) >= limit:
+            break
+        # Resume at the next entry so each suggestion is returned once
+        pos = _SUGGESTION_TEXT.find(needle, _SUGGESTION_STARTS[entry + 1])
+    return suggestions
+
+def _build_query_context(query, cache_key, needs_embedding):
+    """Compute the query embedding once for the whole request."""
+    ctx = QueryContext(query, cache_key=cache_key)
+    if cache_service is not None and needs_embedding:
+        ctx.embedding = cache_service.get_cached_embedding(query)
+    
+    if needs_embedding and ctx.embedding is None:
+        ctx.embedding = hybrid_service.semantic_service.embed_query(query)
+        if cache_service is not None:
+            cache_service.cache_embedding(query, ctx.embedding)
+    return ctx
 
 @search_bp.route('/search', methods=['GET'])
 def search():
@@ -57,19 +110,34 @@ def search():
         if search_type not in ['hybrid', 'semantic', 'keyword']:
             return jsonify({'error': 'Search type must be hybrid, semantic, or keyword'}), 400
         
+        # Serve repeat queries straight from the cache, before touching any index
+        cache_key = None
+        if cache_service is not None:
+            cache_key = cache_service.search_key(
+                query, {'limit': limit, 'alpha': alpha, 'type': search_type}
+            )
+            cached_results = cache_service.get_search_result_by_key(cache_key)
+            if cached_results is not None:
+                return jsonify(cached_results)
+        
+        ctx = _build_query_context(query, cache_key, needs_embedding=search_type != 'keyword')
+        
         # Perform search based on type
         if search_type == 'hybrid':
-            search_results = hybrid_service.search(query, limit, alpha)
+            search_results = hybrid_service.search(ctx, limit, alpha)
         elif search_type == 'semantic':
-            search_results = hybrid_service.search_semantic_only(query, limit)
+            search_results = hybrid_service.search_semantic_only(ctx, limit)
         else:  # keyword
-            search_results = hybrid_service.search_keyword_only(query, limit)
+            search_results = hybrid_service.search_keyword_only(ctx, limit)
         
-        # Get full document details for results
+        # Get full document details for all results in one batch
+        docs = _load_result_documents(
+            [result['doc_id'] for result in search_results['results']]
+        )
         enriched_results = []
         for result in search_results['results']:
             doc_id = result['doc_id']
-            doc = database.get_document(doc_id)
+            doc = docs.get(doc_id)
             
             if doc:
                 enriched_result = {
@@ -80,14 +148,17 @@ def search():
                     'score': result['score'],
                     'semantic_score': result.get('semantic_score', 0),
                     'keyword_score': result.get('keyword_score', 0),
-                    'created_at': doc['created_at'].isoformat(),
-                    'updated_at': doc['updated_at'].isoformat()
+                    'created_at': doc['created_at'],
+                    'updated_at': doc['updated_at']
                 }
                 enriched_results.append(enriched_result)
         
         # Update results with enriched data
         search_results['results'] = enriched_results
         
+        if ctx.cache_key is not None and 'error' not in search_results:
+            cache_service.cache_search_result_by_key(ctx.cache_key, search_results)
+        
         logger.info(f"Search completed: query='{query}', type={search_type}, results={len(enriched_results)}")
         return jsonify(search_results)
         
@@ -110,25 +181,7 @@ def search_suggestions():
         
         # Simple implementation - in production, you'd use a more sophisticated approach
         # like Elasticsearch completion suggester or a dedicated suggestion service
-        suggestions = []
-        
-        # Get recent queries or popular queries from cache/database
-        # This is a placeholder implementation
-        popular_queries = [
-            'machine learning',
-            'artificial intelligence',
-            'data science',
-            'python programming',
-            'web development'
-        ]
-        
-        for popular_query in popular_queries:
-            if query.lower() in popular_query.lower():
-                suggestions.append(popular_query)
-                if len(suggestions) >= limit:
-                    break
-        
-        return jsonify({'suggestions': suggestions})
+        return jsonify({'suggestions': _match_suggestions(query, limit)})
         
     except Exception as e:
         logger.error(f"Error in search suggestions: {e}")
@@ -140,12 +193,13 @@ def search_stats():
     try:
         stats = hybrid_service.get_stats()
         
-        # Add database stats
-        all_docs = database.get_all_documents()
-        stats['database'] = {
-            'total_documents': len(all_docs),
-            'total_content_length': sum(len(doc['content']) for doc in all_docs)
-        }
+        # Add database stats, aggregated by MongoDB and cached for a few minutes
+        db_stats = cache_service.get_cached_search_stats() if cache_service else None
+        if db_stats is None:
+            db_stats = database.get_content_stats()
+            if cache_service:
+                cache_service.cache_search_stats(db_stats)
+        stats['database'] = db_stats
         
         return jsonify(stats)
         
@@ -0,0 +1,64 @@
+import numpy as np
+
+def _ranks(count: int):
+    """Positions of p95 and p99 in a sorted window of count values."""
+    return min(int(0.95 * count), count - 1), min(int(0.99 * count), count - 1)
+
+def _summarize_numpy(values: np.ndarray, target: float):
+    """Current, mean, min, max, p95, p99 and share at or under target, with NumPy."""
+    count = values.size
+    p95_rank, p99_rank = _ranks(count)
+    # Partial selection places both ranks in O(n); a full sort is not needed
+    selected = np.partition(values, (p95_rank, p99_rank))
+    meeting = np.count_nonzero(values <= target) / count * 100.0
+    return (
+        float(values[-1]), float(values.mean()), float(values.min()), float(values.max()),
+        float(selected[p95_rank]), float(selected[p99_rank]), float(meeting)
+    )
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _summarize_numba(values, target):
+        """Single pass for the reductions, partial selection for the percentiles."""
+        count = values.shape[0]
+        total = 0.0
+        low = values[0]
+        high = values[0]
+        meeting = 0
+        for i in range(count):
+            value = values[i]
+            total += value
+            if value < low:
+                low = value
+            if value > high:
+                high = value
+            if value <= target:
+                meeting += 1
+        
+        p95_rank = min(int(0.95 * count), count - 1)
+        p99_rank = min(int(0.99 * count), count - 1)
+        # p99 is selected first; everything above it is then >= p95, so the
+        # second selection only has to look at the lower part
+        selected = np.partition(values, p99_rank)
+        p99 = selected[p99_rank]
+        p95 = np.partition(selected[:p99_rank + 1], p95_rank)[p95_rank]
+        return (
+            values[count - 1], total / count, low, high,
+            p95, p99, meeting / count * 100.0
+        )
+
+def summarize(values: np.ndarray, target: float = np.inf):
+    """Return (current, avg, min, max, p95, p99, meeting_target_pct) for a window.
+    
+    ``values`` must be non-empty and in time order. Uses the numba-compiled
+    loop when numba is installed and falls back to NumPy otherwise.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if njit is not None:
+        return tuple(float(v) for v in _summarize_numba(values, float(target)))
+    return _summarize_numpy(values, target)
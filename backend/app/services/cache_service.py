@@ -2,12 +2,62 @@ import redis
 import json
 import pickle
 import logging
-from typing import Any, Optional, Union
+import threading
+import numpy as np
+import orjson
+from cachetools import TTLCache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
+from functools import lru_cache
 import hashlib
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=1024)
+def _hash_config(frozen_items: tuple) -> str:
+    """Hash a sorted tuple of config items; repeated configs hit the LRU."""
+    return hashlib.blake2b(str(frozen_items).encode(), digest_size=8).hexdigest()
+
+# One-byte format tags prefixed to every cached value
+_TAG_JSON = b'J'
+_TAG_FLOAT32 = b'f'
+_TAG_FLOAT16 = b'e'
+_PICKLE_MARKER = 0x80  # First byte of pickles written before the tags existed
+
+def _serialize(value: Any) -> bytes:
+    """Encode a value for Redis: raw bytes for float32 arrays, orjson otherwise."""
+    if isinstance(value, np.ndarray) and value.dtype == np.float32:
+        return _TAG_FLOAT32 + value.tobytes()
+    if isinstance(value, np.ndarray) and value.dtype == np.float16:
+        return _TAG_FLOAT16 + value.tobytes()
+    return _TAG_JSON + orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+
+def _deserialize(data: bytes) -> Any:
+    """Decode a value written by _serialize, or a legacy pickle."""
+    tag = data[:1]
+    if tag == _TAG_JSON:
+        return orjson.loads(data[1:])
+    if tag == _TAG_FLOAT32:
+        return np.frombuffer(data, dtype=np.float32, offset=1)
+    if tag == _TAG_FLOAT16:
+        return np.frombuffer(data, dtype=np.float16, offset=1).astype(np.float32)
+    if data[0] == _PICKLE_MARKER:
+        return pickle.loads(data)
+    raise ValueError(f"Unknown cache value format: {tag!r}")
+
+def _compact_embedding(embedding) -> np.ndarray:
+    """Downcast an embedding to float16 for storage; half the bytes of float32."""
+    return np.asarray(embedding, dtype=np.float16).ravel()
+
+def _config_key(config: dict) -> str:
+    """Stable key fragment for a search config dict."""
+    items = tuple(sorted(config.items()))
+    try:
+        return _hash_config(items)
+    except TypeError:
+        # Unhashable values (e.g. lists) cannot go through the LRU
+        return _hash_config.__wrapped__(items)
+
 class CacheService:
     """Redis-based caching service for search results and embeddings."""
     
@@ -15,6 +65,11 @@ class CacheService:
         self.redis_client = redis.from_url(redis_url, decode_responses=False)
         self.default_ttl = default_ttl
         
+        # Per-process copies of hot entries so repeat lookups skip the Redis round-trip
+        self._local_lock = threading.RLock()
+        self._local_search = TTLCache(maxsize=1024, ttl=60)
+        self._local_embeddings = TTLCache(maxsize=10000, ttl=300)
+        
         # Test connection
         try:
             self.redis_client.ping()
@@ -25,16 +80,16 @@ class CacheService:
     
     def _generate_key(self, prefix: str, *args) -> str:
         """Generate a cache key from prefix and arguments."""
-        key_parts = [prefix] + [str(arg) for arg in args]
-        key_string = ":".join(key_parts)
-        return hashlib.md5(key_string.encode()).hexdigest()
+        key_bytes = b":".join(str(part).encode() for part in (prefix, *args))
+        # Keep the prefix readable so invalidation can match it with SCAN
+        return f"{prefix}:{hashlib.blake2b(key_bytes, digest_size=16).hexdigest()}"
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache."""
         try:
             cached_data = self.redis_client.get(key)
             if cached_data:
-                return pickle.loads(cached_data)
+                return _deserialize(cached_data)
             return None
         except Exception as e:
             logger.error(f"Error getting cache key {key}: {e}")
@@ -43,7 +98,7 @@ class CacheService:
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set value in cache with optional TTL."""
         try:
-            serialized_data = pickle.dumps(value)
+            serialized_data = _serialize(value)
             ttl = ttl or self.default_ttl
             self.redis_client.setex(key, ttl, serialized_data)
             return True
@@ -51,6 +106,39 @@ class CacheService:
             logger.error(f"Error setting cache key {key}: {e}")
             return False
     
+    def mget(self, keys: List[str]) -> Dict[str, Any]:
+        """Get many values in one pipelined round-trip; missing keys are omitted."""
+        if not keys:
+            return {}
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.get(key)
+            raw = pipe.execute()
+            return {
+                key: _deserialize(data)
+                for key, data in zip(keys, raw)
+                if data
+            }
+        except Exception as e:
+            logger.error(f"Error getting {len(keys)} cache keys: {e}")
+            return {}
+    
+    def mset(self, items: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """Set many values with a TTL in one pipelined round-trip."""
+        if not items:
+            return True
+        try:
+            ttl = ttl or self.default_ttl
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.setex(key, ttl, _serialize(value))
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error setting {len(items)} cache keys: {e}")
+            return False
+    
     def delete(self, key: str) -> bool:
         """Delete key from cache."""
         try:
@@ -90,36 +178,112 @@ class CacheService:
             return False
     
     # Search-specific cache methods
+    def _local_get(self, local: TTLCache, key: str) -> Optional[Any]:
+        """Look a key up in a local cache, then Redis, filling the local cache on a hit."""
+        with self._local_lock:
+            value = local.get(key)
+        if value is not None:
+            return value
+        
+        value = self.get(key)
+        if value is not None:
+            with self._local_lock:
+                local[key] = value
+        return value
+    
+    def _local_set(self, local: TTLCache, key: str, value: Any, ttl: int) -> bool:
+        """Store a value in Redis and the local cache."""
+        with self._local_lock:
+            local[key] = value
+        return self.set(key, value, ttl=ttl)
+    
+    def search_key(self, query: str, config: dict) -> str:
+        """Cache key for a search result; compute once and use the *_by_key methods."""
+        return self._generate_key("search", query, _config_key(config))
+    
     def cache_search_result(self, query: str, config: dict, result: dict) -> bool:
         """Cache search result."""
-        key = self._generate_key("search", query, str(sorted(config.items())))
-        return self.set(key, result, ttl=1800)  # 30 minutes
+        return self.cache_search_result_by_key(self.search_key(query, config), result)
     
     def get_cached_search_result(self, query: str, config: dict) -> Optional[dict]:
         """Get cached search result."""
-        key = self._generate_key("search", query, str(sorted(config.items())))
-        return self.get(key)
+        return self.get_search_result_by_key(self.search_key(query, config))
+    
+    def cache_search_result_by_key(self, key: str, result: dict) -> bool:
+        """Cache search result under a key from search_key."""
+        return self._local_set(self._local_search, key, result, ttl=1800)  # 30 minutes
+    
+    def get_search_result_by_key(self, key: str) -> Optional[dict]:
+        """Get cached search result under a key from search_key."""
+        return self._local_get(self._local_search, key)
     
-    def cache_embedding(self, text: str, embedding: list) -> bool:
-        """Cache text embedding."""
+    def cache_embedding(self, text: str, embedding: np.ndarray) -> bool:
+        """Cache text embedding as float16."""
         key = self._generate_key("embedding", text)
-        return self.set(key, embedding, ttl=86400)  # 24 hours
+        compact = _compact_embedding(embedding)
+        # Redis keeps the float16 bytes; the in-process copy is float32, as reads return
+        with self._local_lock:
+            self._local_embeddings[key] = compact.astype(np.float32)
+        return self.set(key, compact, ttl=86400)  # 24 hours
     
-    def get_cached_embedding(self, text: str) -> Optional[list]:
-        """Get cached text embedding."""
+    def get_cached_embedding(self, text: str) -> Optional[np.ndarray]:
+        """Get cached text embedding as a float32 array."""
         key = self._generate_key("embedding", text)
-        return self.get(key)
+        return self._local_get(self._local_embeddings, key)
     
-    def cache_document_embedding(self, doc_id: str, embedding: list) -> bool:
-        """Cache document embedding."""
+    def cache_document_embedding(self, doc_id: str, embedding: np.ndarray) -> bool:
+        """Cache document embedding as float16."""
         key = self._generate_key("doc_embedding", doc_id)
-        return self.set(key, embedding, ttl=86400)  # 24 hours
+        return self.set(key, _compact_embedding(embedding), ttl=86400)  # 24 hours
     
-    def get_cached_document_embedding(self, doc_id: str) -> Optional[list]:
-        """Get cached document embedding."""
+    def get_cached_document_embedding(self, doc_id: str) -> Optional[np.ndarray]:
+        """Get cached document embedding as a float32 array."""
         key = self._generate_key("doc_embedding", doc_id)
         return self.get(key)
     
+    def cache_document_embeddings(self, embeddings: Dict[str, np.ndarray]) -> bool:
+        """Cache embeddings for a batch of documents, keyed by document ID."""
+        items = {
+            self._generate_key("doc_embedding", doc_id): _compact_embedding(embedding)
+            for doc_id, embedding in embeddings.items()
+        }
+        return self.mset(items, ttl=86400)  # 24 hours
+    
+    def get_cached_document_embeddings(self, doc_ids: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Get cached embeddings for a batch of documents; misses are omitted."""
+        keys = {self._generate_key("doc_embedding", doc_id): doc_id for doc_id in doc_ids}
+        cached = self.mget(list(keys))
+        return {keys[key]: embedding for key, embedding in cached.items()}
+    
+    def get_cached_documents(self, doc_ids: List[str]) -> Tuple[Dict[str, dict], List[str]]:
+        """Get cached documents in one round-trip; returns (hits, missing_ids)."""
+        keys = [self._generate_key("doc", doc_id) for doc_id in doc_ids]
+        cached = self.mget(keys)
+        hits = {}
+        misses = []
+        for doc_id, key in zip(doc_ids, keys):
+            if key in cached:
+                hits[doc_id] = cached[key]
+            else:
+                misses.append(doc_id)
+        return hits, misses
+    
+    def cache_documents(self, docs: Dict[str, dict]) -> bool:
+        """Cache documents keyed by document ID."""
+        items = {self._generate_key("doc", doc_id): doc for doc_id, doc in docs.items()}
+        return self.mset(items, ttl=3600)  # 1 hour
+    
+    def invalidate_documents(self, doc_ids: Iterable[str]) -> bool:
+        """Drop cached copies of documents that changed."""
+        try:
+            keys = [self._generate_key("doc", doc_id) for doc_id in doc_ids]
+            if keys:
+                self.redis_client.unlink(*keys)
+            return True
+        except Exception as e:
+            logger.error(f"Error invalidating cached documents: {e}")
+            return False
+    
     def cache_popular_queries(self, queries: list) -> bool:
         """Cache popular queries."""
         key = "popular_queries"
@@ -138,13 +302,34 @@ class CacheService:
         """Get cached search statistics."""
         return self.get("search_stats")
     
+    def _unlink_matching(self, *patterns: str, batch_size: int = 500) -> int:
+        """Delete keys matching patterns using SCAN and pipelined UNLINK.
+        
+        Unlike KEYS, SCAN never blocks Redis for the whole keyspace, and UNLINK
+        frees memory in the background.
+        """
+        deleted = 0
+        pipe = self.redis_client.pipeline(transaction=False)
+        batch = []
+        for pattern in patterns:
+            for key in self.redis_client.scan_iter(match=pattern, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    pipe.unlink(*batch)
+                    deleted += len(batch)
+                    batch.clear()
+        if batch:
+            pipe.unlink(*batch)
+            deleted += len(batch)
+        pipe.execute()
+        return deleted
+    
     def invalidate_search_cache(self) -> bool:
         """Invalidate all search-related cache."""
+        with self._local_lock:
+            self._local_search.clear()
         try:
-            # Get all keys with search prefix
-            keys = self.redis_client.keys("search:*")
-            if keys:
-                self.redis_client.delete(*keys)
+            self._unlink_matching("search:*")
             return True
         except Exception as e:
             logger.error(f"Error invalidating search cache: {e}")
@@ -152,11 +337,10 @@ class CacheService:
     
     def invalidate_embedding_cache(self) -> bool:
         """Invalidate all embedding cache."""
+        with self._local_lock:
+            self._local_embeddings.clear()
         try:
-            # Get all keys with embedding prefix
-            keys = self.redis_client.keys("embedding:*")
-            if keys:
-                self.redis_client.delete(*keys)
+            self._unlink_matching("embedding:*", "doc_embedding:*")
             return True
         except Exception as e:
             logger.error(f"Error invalidating embedding cache: {e}")
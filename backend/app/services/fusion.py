@@ -0,0 +1,78 @@
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def _fuse_topk_numpy(semantic: np.ndarray, keyword: np.ndarray, alpha: float, k: int):
+    """Weighted score fusion and top-k selection with NumPy."""
+    hybrid = alpha * semantic + (1 - alpha) * keyword
+    count = hybrid.shape[0]
+    
+    # Select the top k without sorting every candidate
+    if 0 < k < count:
+        top = np.argpartition(-hybrid, k - 1)[:k]
+    else:
+        top = np.arange(count)[:max(k, 0)]
+    top = top[np.argsort(-hybrid[top], kind='stable')]
+    return top, hybrid[top]
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _fuse_topk_numba(semantic, keyword, alpha, k):
+        """Fuse scores and keep the top k in a bounded min-heap, in one pass."""
+        count = semantic.shape[0]
+        k = max(min(k, count), 0)
+        heap_idx = np.empty(k, dtype=np.int64)
+        heap_val = np.empty(k, dtype=np.float64)
+        size = 0
+        
+        for i in range(count):
+            value = alpha * semantic[i] + (1.0 - alpha) * keyword[i]
+            if size < k:
+                # Push and sift up
+                j = size
+                heap_val[j] = value
+                heap_idx[j] = i
+                size += 1
+                while j > 0:
+                    parent = (j - 1) // 2
+                    if heap_val[parent] <= heap_val[j]:
+                        break
+                    heap_val[parent], heap_val[j] = heap_val[j], heap_val[parent]
+                    heap_idx[parent], heap_idx[j] = heap_idx[j], heap_idx[parent]
+                    j = parent
+            elif k > 0 and value > heap_val[0]:
+                # Replace the smallest kept score and sift down
+                heap_val[0] = value
+                heap_idx[0] = i
+                j = 0
+                while True:
+                    left = 2 * j + 1
+                    smallest = j
+                    if left < size and heap_val[left] < heap_val[smallest]:
+                        smallest = left
+                    if left + 1 < size and heap_val[left + 1] < heap_val[smallest]:
+                        smallest = left + 1
+                    if smallest == j:
+                        break
+                    heap_val[smallest], heap_val[j] = heap_val[j], heap_val[smallest]
+                    heap_idx[smallest], heap_idx[j] = heap_idx[j], heap_idx[smallest]
+                    j = smallest
+        
+        order = np.argsort(-heap_val[:size], kind='mergesort')
+        return heap_idx[order], heap_val[order]
+
+def fuse_topk(semantic: np.ndarray, keyword: np.ndarray, alpha: float, k: int):
+    """Return indices and hybrid scores of the k best candidates, best first.
+    
+    Uses the numba-compiled heap selection when numba is installed and falls
+    back to NumPy otherwise.
+    """
+    if njit is not None:
+        return _fuse_topk_numba(semantic, keyword, float(alpha), int(k))
+    return _fuse_topk_numpy(semantic, keyword, alpha, k)
@@ -1,11 +1,20 @@
 import logging
-from typing import List, Dict, Tuple
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from typing import List, Dict, Iterable, Optional, Tuple, Union
 import time
+from .fusion import fuse_topk
+from .query_context import QueryContext
 from .semantic_search import SemanticSearchService
 from .keyword_search import KeywordSearchService
 
 logger = logging.getLogger(__name__)
 
+# Each request thread hands at most one semantic search to the pool at a time,
+# so one worker per gunicorn thread keeps concurrent searches from queueing
+SEARCH_POOL_WORKERS = int(os.getenv('GUNICORN_THREADS', '8'))
+
 class HybridSearchService:
     """Hybrid search combining semantic and keyword search."""
     
@@ -13,78 +22,35 @@ class HybridSearchService:
         self.semantic_service = semantic_service
         self.keyword_service = keyword_service
         self.default_alpha = 0.7  # Weight for semantic search (0.7 = 70% semantic, 30% keyword)
+        # Runs the semantic search beside the keyword one, which stays on the
+        # request thread; FAISS and sparse BLAS release the GIL
+        self._pool = ThreadPoolExecutor(
+            max_workers=SEARCH_POOL_WORKERS, thread_name_prefix='hybrid-search'
+        )
     
-    def search(self, query: str, k: int = 10, alpha: float = None) -> Dict:
+    def search(self, query: Union[str, QueryContext], k: int = 10, alpha: float = None) -> Dict:
         """Perform hybrid search combining semantic and keyword results."""
         start_time = time.time()
+        ctx = query if isinstance(query, QueryContext) else QueryContext(query)
+        query = ctx.query
         
         try:
             if alpha is None:
                 alpha = self.default_alpha
             
-            # Perform both searches
-            semantic_results = self.semantic_service.search(query, k * 2)  # Get more results for better ranking
+            # Perform both searches concurrently, fetching extra results for better ranking
+            semantic_future = self._pool.submit(
+                self.semantic_service.search, query, k * 2, ctx.embedding
+            )
             keyword_results = self.keyword_service.search(query, k * 2)
+            semantic_results = semantic_future.result()
             
-            # Convert to dictionaries for easier merging
-            semantic_scores = {doc_id: score for doc_id, score in semantic_results}
-            keyword_scores = {doc_id: score for doc_id, score in keyword_results}
-            
-            # Get all unique document IDs
-            all_doc_ids = set(semantic_scores.keys()) | set(keyword_scores.keys())
-            
-            # Calculate hybrid scores
-            hybrid_scores = {}
-            for doc_id in all_doc_ids:
-                semantic_score = semantic_scores.get(doc_id, 0.0)
-                keyword_score = keyword_scores.get(doc_id, 0.0)
-                
-                # Normalize scores to [0, 1] range
-                semantic_norm = semantic_score  # Already normalized
-                keyword_norm = keyword_score    # Already normalized
-                
-                # Calculate hybrid score
-                hybrid_score = alpha * semantic_norm + (1 - alpha) * keyword_norm
-                
-                hybrid_scores[doc_id] = {
-                    'hybrid_score': hybrid_score,
-                    'semantic_score': semantic_score,
-                    'keyword_score': keyword_score
-                }
-            
-            # Sort by hybrid score and get top k
-            sorted_results = sorted(
-                hybrid_scores.items(),
-                key=lambda x: x[1]['hybrid_score'],
-                reverse=True
-            )[:k]
-            
-            # Format results
-            results = []
-            for doc_id, scores in sorted_results:
-                results.append({
-                    'doc_id': doc_id,
-                    'score': scores['hybrid_score'],
-                    'semantic_score': scores['semantic_score'],
-                    'keyword_score': scores['keyword_score']
-                })
-            
-            response_time = (time.time() - start_time) * 1000  # Convert to milliseconds
-            
-            logger.info(f"Hybrid search completed in {response_time:.2f}ms with {len(results)} results")
-            
-            return {
-                'results': results,
-                'query': query,
-                'total_results': len(results),
-                'response_time_ms': round(response_time, 2),
-                'alpha': alpha,
-                'search_stats': {
-                    'semantic_results_count': len(semantic_results),
-                    'keyword_results_count': len(keyword_results),
-                    'unique_documents': len(all_doc_ids)
-                }
-            }
+            result = self._fuse(query, semantic_results, keyword_results, k, alpha, start_time)
+            logger.info(
+                f"Hybrid search completed in {result['response_time_ms']:.2f}ms "
+                f"with {result['total_results']} results"
+            )
+            return result
             
         except Exception as e:
             logger.error(f"Error in hybrid search: {e}")
@@ -96,6 +62,96 @@ class HybridSearchService:
                 'error': str(e)
             }
     
+    def search_batch(self, queries: List[str], k: int = 10, alpha: float = None) -> List[Dict]:
+        """Hybrid search for several queries, encoding them in one model call.
+        
+        Returns one result dict per query, shaped like search()'s.
+        """
+        start_time = time.time()
+        
+        try:
+            if alpha is None:
+                alpha = self.default_alpha
+            
+            semantic_future = self._pool.submit(self.semantic_service.search_batch, queries, k * 2)
+            keyword_batches = [self.keyword_service.search(query, k * 2) for query in queries]
+            semantic_batches = semantic_future.result()
+            
+            results = [
+                self._fuse(query, semantic_results, keyword_results, k, alpha, start_time)
+                for query, semantic_results, keyword_results
+                in zip(queries, semantic_batches, keyword_batches)
+            ]
+            logger.info(
+                f"Hybrid batch search of {len(queries)} queries completed in "
+                f"{(time.time() - start_time) * 1000:.2f}ms"
+            )
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error in hybrid batch search: {e}")
+            return [
+                {
+                    'results': [],
+                    'query': query,
+                    'total_results': 0,
+                    'response_time_ms': (time.time() - start_time) * 1000,
+                    'error': str(e)
+                }
+                for query in queries
+            ]
+    
+    def _fuse(self, query: str, semantic_results: List[Tuple[str, float]],
+              keyword_results: List[Tuple[str, float]], k: int, alpha: float,
+              start_time: float) -> Dict:
+        """Merge one query's semantic and keyword results into the hybrid response."""
+        # Convert to dictionaries for easier merging
+        semantic_scores = {doc_id: score for doc_id, score in semantic_results}
+        keyword_scores = {doc_id: score for doc_id, score in keyword_results}
+        
+        # Get all unique document IDs
+        all_doc_ids = list(semantic_scores.keys() | keyword_scores.keys())
+        count = len(all_doc_ids)
+        
+        # Align scores into arrays; both are already normalized to [0, 1]
+        semantic_array = np.fromiter(
+            (semantic_scores.get(doc_id, 0.0) for doc_id in all_doc_ids),
+            dtype=np.float64, count=count
+        )
+        keyword_array = np.fromiter(
+            (keyword_scores.get(doc_id, 0.0) for doc_id in all_doc_ids),
+            dtype=np.float64, count=count
+        )
+        
+        # Calculate hybrid scores and select the top k
+        top, top_scores = fuse_topk(semantic_array, keyword_array, alpha, k)
+        
+        # Format results
+        results = [
+            {
+                'doc_id': all_doc_ids[i],
+                'score': float(score),
+                'semantic_score': float(semantic_array[i]),
+                'keyword_score': float(keyword_array[i])
+            }
+            for i, score in zip(top, top_scores)
+        ]
+        
+        response_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+        
+        return {
+            'results': results,
+            'query': query,
+            'total_results': len(results),
+            'response_time_ms': round(response_time, 2),
+            'alpha': alpha,
+            'search_stats': {
+                'semantic_results_count': len(semantic_results),
+                'keyword_results_count': len(keyword_results),
+                'unique_documents': len(all_doc_ids)
+            }
+        }
+    
     def add_document(self, doc_id: str, content: str):
         """Add a document to both search indices."""
         try:
@@ -106,23 +162,35 @@ class HybridSearchService:
             logger.error(f"Error adding document {doc_id}: {e}")
             raise
     
-    def add_documents_batch(self, documents: List[Tuple[str, str]]):
-        """Add multiple documents to both search indices."""
+    def add_documents_batch(self, documents: List[Tuple[str, str]],
+                            embeddings: Optional[np.ndarray] = None):
+        """Add multiple documents to both search indices, reusing precomputed embeddings."""
         try:
-            self.semantic_service.add_documents_batch(documents)
-            self.keyword_service.add_documents_batch(documents)
+            # Split the pairs once and hand both indices the same parallel lists
+            doc_ids = [doc_id for doc_id, _ in documents]
+            contents = [content for _, content in documents]
+            self.semantic_service.add_documents(doc_ids, contents, embeddings)
+            self.keyword_service.add_documents(doc_ids, contents)
             logger.info(f"Added {len(documents)} documents to hybrid search index")
         except Exception as e:
             logger.error(f"Error adding documents batch: {e}")
             raise
     
-    def rebuild_index(self, documents: List[Tuple[str, str]]):
-        """Rebuild both search indices."""
+    def rebuild_index(self, documents: Iterable[Tuple[str, str]]) -> int:
+        """Rebuild both search indices from a single pass over documents.
+        
+        The keyword index has to hold every document's content anyway, so the
+        semantic index is fed from it rather than from a second copy.
+        Returns the number of documents indexed.
+        """
         try:
             logger.info("Rebuilding hybrid search index")
-            self.semantic_service.rebuild_index(documents)
             self.keyword_service.rebuild_index(documents)
+            self.semantic_service.rebuild_index(
+                zip(self.keyword_service.document_ids, self.keyword_service.documents)
+            )
             logger.info("Hybrid search index rebuilt successfully")
+            return len(self.keyword_service.document_ids)
         except Exception as e:
             logger.error(f"Error rebuilding hybrid index: {e}")
             raise
@@ -143,12 +211,14 @@ class HybridSearchService:
         else:
             raise ValueError("Alpha must be between 0 and 1")
     
-    def search_semantic_only(self, query: str, k: int = 10) -> Dict:
+    def search_semantic_only(self, query: Union[str, QueryContext], k: int = 10) -> Dict:
         """Perform semantic search only."""
         start_time = time.time()
+        ctx = query if isinstance(query, QueryContext) else QueryContext(query)
+        query = ctx.query
         
         try:
-            results = self.semantic_service.search(query, k)
+            results = self.semantic_service.search(query, k, ctx.embedding)
             
             formatted_results = []
             for doc_id, score in results:
@@ -178,9 +248,11 @@ class HybridSearchService:
                 'error': str(e)
             }
     
-    def search_keyword_only(self, query: str, k: int = 10) -> Dict:
+    def search_keyword_only(self, query: Union[str, QueryContext], k: int = 10) -> Dict:
         """Perform keyword search only."""
         start_time = time.time()
+        if isinstance(query, QueryContext):
+            query = query.query
         
         try:
             results = self.keyword_service.search(query, k)
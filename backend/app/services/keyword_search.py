@@ -1,38 +1,77 @@
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from scipy.sparse import vstack
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
 import logging
-from typing import List, Dict, Tuple
+from typing import List, Dict, Iterable, Sequence, Tuple
 import pickle
 import os
+import threading
+import atexit
 
 logger = logging.getLogger(__name__)
 
+# Refit the vocabulary and IDF weights once this share of documents was
+# added since the last fit; until then new documents are only transformed
+REFIT_RATIO = 0.1
+
+# BM25 term-frequency saturation and document length normalization
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Refits mark the vectorizer dirty; a background thread writes it at most this often
+SAVE_INTERVAL_S = 30
+
 class KeywordSearchService:
-    """Keyword search using TF-IDF and BM25."""
+    """Keyword search using BM25 over a sparse term matrix.
     
-    def __init__(self, vectorizer_path='./data/tfidf_vectorizer.pkl'):
+    BM25 weights are computed once per document at index time, so a query is
+    scored with a single sparse product, the same eager scheme bm25s uses.
+    """
+    
+    def __init__(self, vectorizer_path='./data/tfidf_vectorizer.pkl', save_interval_s=SAVE_INTERVAL_S):
         self.vectorizer_path = vectorizer_path
+        self.save_interval_s = save_interval_s
         self.vectorizer = None
-        self.tfidf_matrix = None
+        self.bm25_matrix = None
+        self._bm25_matrix_t = None  # CSR transpose of bm25_matrix for query products
+        self._idf = None  # BM25 idf per vocabulary term, from the last fit
+        self._avgdl = 1.0  # Average document length in terms, from the last fit
         self.document_ids = []
+        self._doc_ids_arr = np.empty(0, dtype=object)  # document_ids for fancy indexing
         self.documents = []
+        self._fitted_count = 0  # Documents in the corpus at the last fit
+        self._doc_index = {}  # doc_id -> row in bm25_matrix (latest row wins)
+        
+        # Adds rebuild the id array and matrix from their previous values, so
+        # writers hold this lock; searches take it to read a matching pair
+        self._index_lock = threading.Lock()
+        
+        # Debounced persistence; the lock keeps a save from pickling a half-done fit
+        self._dirty = False
+        self._save_lock = threading.Lock()
+        self._stop_saver = threading.Event()
         
         # Create data directory if it doesn't exist
         os.makedirs(os.path.dirname(vectorizer_path), exist_ok=True)
         
         self._load_vectorizer()
+        
+        self._saver = threading.Thread(target=self._save_loop, name='vectorizer-saver', daemon=True)
+        self._saver.start()
+        atexit.register(self.close)
     
     def _load_vectorizer(self):
-        """Load or create TF-IDF vectorizer."""
+        """Load or create the term count vectorizer."""
         try:
             if os.path.exists(self.vectorizer_path):
-                logger.info("Loading existing TF-IDF vectorizer")
+                logger.info("Loading existing vectorizer")
                 with open(self.vectorizer_path, 'rb') as f:
                     self.vectorizer = pickle.load(f)
-            else:
-                logger.info("Creating new TF-IDF vectorizer")
-                self.vectorizer = TfidfVectorizer(
+            
+            # TF-IDF vectorizers saved before BM25 scoring do not return raw counts
+            if self.vectorizer is None or isinstance(self.vectorizer, TfidfVectorizer):
+                logger.info("Creating new count vectorizer")
+                self.vectorizer = CountVectorizer(
                     max_features=10000,
                     stop_words='english',
                     ngram_range=(1, 2),
@@ -44,7 +83,7 @@ class KeywordSearchService:
             raise
     
     def _save_vectorizer(self):
-        """Save TF-IDF vectorizer."""
+        """Save the vectorizer."""
         try:
             with open(self.vectorizer_path, 'wb') as f:
                 pickle.dump(self.vectorizer, f)
@@ -52,14 +91,34 @@ class KeywordSearchService:
         except Exception as e:
             logger.error(f"Error saving vectorizer: {e}")
     
+    def _save_loop(self):
+        """Periodically write the vectorizer if a refit changed it."""
+        while not self._stop_saver.wait(self.save_interval_s):
+            self.flush()
+    
+    def flush(self):
+        """Write the vectorizer to disk if it changed since the last save."""
+        with self._save_lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._save_vectorizer()
+    
+    def close(self):
+        """Stop the background saver and write any pending changes."""
+        self._stop_saver.set()
+        self.flush()
+    
     def add_document(self, doc_id: str, content: str):
         """Add a document to the keyword search index."""
         try:
-            self.document_ids.append(doc_id)
-            self.documents.append(content)
-            
-            # Rebuild TF-IDF matrix
-            self._rebuild_tfidf_matrix()
+            with self._index_lock:
+                self._doc_index[doc_id] = len(self.document_ids)
+                self.document_ids.append(doc_id)
+                self._append_doc_ids([doc_id])
+                self.documents.append(content)
+                
+                self._add_to_bm25_matrix([content])
             
             logger.info(f"Added document {doc_id} to keyword index")
         except Exception as e:
@@ -67,59 +126,135 @@ class KeywordSearchService:
             raise
     
     def add_documents_batch(self, documents: List[Tuple[str, str]]):
-        """Add multiple documents to the keyword search index."""
+        """Add multiple (doc_id, content) pairs to the keyword search index."""
+        self.add_documents(
+            [doc_id for doc_id, _ in documents],
+            [content for _, content in documents]
+        )
+    
+    def add_documents(self, doc_ids: Sequence[str], contents: Sequence[str]):
+        """Add documents given as parallel id and content lists."""
         try:
-            doc_ids, contents = zip(*documents)
-            
-            self.document_ids.extend(doc_ids)
-            self.documents.extend(contents)
-            
-            # Rebuild TF-IDF matrix
-            self._rebuild_tfidf_matrix()
+            with self._index_lock:
+                start = len(self.document_ids)
+                self._doc_index.update((doc_id, start + i) for i, doc_id in enumerate(doc_ids))
+                self.document_ids.extend(doc_ids)
+                self._append_doc_ids(doc_ids)
+                self.documents.extend(contents)
+                
+                self._add_to_bm25_matrix(contents)
             
-            logger.info(f"Added {len(documents)} documents to keyword index")
+            logger.info(f"Added {len(doc_ids)} documents to keyword index")
         except Exception as e:
             logger.error(f"Error adding documents batch: {e}")
             raise
     
-    def _rebuild_tfidf_matrix(self):
-        """Rebuild the TF-IDF matrix."""
+    def _append_doc_ids(self, doc_ids):
+        """Extend the object array mirror of document_ids; the caller holds _index_lock."""
+        new_ids = np.empty(len(doc_ids), dtype=object)
+        new_ids[:] = doc_ids
+        self._doc_ids_arr = np.concatenate([self._doc_ids_arr, new_ids])
+    
+    def _add_to_bm25_matrix(self, contents):
+        """Append rows for newly added documents to the BM25 matrix.
+        
+        The caller holds _index_lock. New documents are weighted with the current vocabulary and idf, so only
+        their own tokens are processed. The whole corpus is refit when there
+        is no matrix yet or enough documents arrived to shift the idf weights.
+        """
+        unfitted = len(self.documents) - self._fitted_count
+        if self.bm25_matrix is None or unfitted > REFIT_RATIO * len(self.documents):
+            self._rebuild_bm25_matrix()
+            return
+        
+        new_rows = self._bm25_weights(self.vectorizer.transform(contents))
+        self._set_bm25_matrix(vstack([self.bm25_matrix, new_rows], format='csr'))
+    
+    def _bm25_weights(self, counts):
+        """Turn raw term counts into BM25 term weights with the fitted idf and avgdl."""
+        weights = counts.tocsr().astype(np.float32)
+        doc_len = np.asarray(weights.sum(axis=1)).ravel()
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len / self._avgdl)
+        
+        # Expand the per-row normalizer to one value per stored entry
+        tf = weights.data
+        entry_norm = np.repeat(length_norm, np.diff(weights.indptr))
+        weights.data = self._idf[weights.indices] * tf * (BM25_K1 + 1) / (tf + entry_norm)
+        return weights
+    
+    def _set_bm25_matrix(self, matrix):
+        """Store the matrix as CSR along with its CSR transpose.
+        
+        A CSC operand (what .T returns) is converted to CSR inside every sparse
+        product, so keeping the transpose ready saves a full copy per search.
+        """
+        self.bm25_matrix = matrix.tocsr()
+        self._bm25_matrix_t = self.bm25_matrix.T.tocsr()
+    
+    def _rebuild_bm25_matrix(self):
+        """Refit the vocabulary and idf, then rebuild the BM25 matrix."""
         try:
             if not self.documents:
-                self.tfidf_matrix = None
+                self.bm25_matrix = None
+                self._bm25_matrix_t = None
+                self._fitted_count = 0
                 return
             
-            # Fit and transform documents
-            self.tfidf_matrix = self.vectorizer.fit_transform(self.documents)
-            
-            # Save the updated vectorizer
-            self._save_vectorizer()
+            with self._save_lock:
+                counts = self.vectorizer.fit_transform(self.documents).tocsr()
+                
+                # Document frequency is the number of stored entries per term column
+                n_docs = counts.shape[0]
+                df = np.bincount(counts.indices, minlength=counts.shape[1])
+                self._idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+                self._avgdl = max(counts.sum() / n_docs, 1.0)
+                
+                self._set_bm25_matrix(self._bm25_weights(counts))
+                # The saver thread writes the refit vectorizer off the ingest path
+                self._dirty = True
+            self._fitted_count = len(self.documents)
             
-            logger.info(f"Rebuilt TF-IDF matrix with {len(self.documents)} documents")
+            logger.info(f"Rebuilt BM25 matrix with {len(self.documents)} documents")
         except Exception as e:
-            logger.error(f"Error rebuilding TF-IDF matrix: {e}")
+            logger.error(f"Error rebuilding BM25 matrix: {e}")
             raise
     
     def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
         """Search for documents using keyword matching."""
         try:
-            if self.tfidf_matrix is None or len(self.documents) == 0:
+            # Rows of the matrix and the id array must come from the same update
+            with self._index_lock:
+                matrix_t = self._bm25_matrix_t
+                doc_ids_arr = self._doc_ids_arr
+                idf = self._idf
+            if matrix_t is None:
                 return []
             
-            # Transform query to TF-IDF vector
+            # Each query term counts once; the BM25 score is a sum of term weights
             query_vector = self.vectorizer.transform([query])
+            if query_vector.nnz == 0:
+                return []
+            query_vector.data[:] = 1
+            
+            # Scale by the best score any document could reach so scores stay in [0, 1]
+            max_score = float(idf[query_vector.indices].sum()) * (BM25_K1 + 1)
+            similarities = (query_vector @ matrix_t).toarray().ravel() / max_score
             
-            # Calculate cosine similarity
-            similarities = cosine_similarity(query_vector, self.tfidf_matrix).flatten()
+            # Get top k results without sorting every document
+            if k < similarities.size:
+                top_indices = np.argpartition(-similarities, k)[:k]
+            else:
+                top_indices = np.arange(similarities.size)
+            top_indices = top_indices[np.argsort(-similarities[top_indices], kind='stable')]
             
-            # Get top k results
-            top_indices = np.argsort(similarities)[::-1][:k]
+            # Only return documents with non-zero similarity
+            top_indices = top_indices[similarities[top_indices] > 0]
             
             # Return results with document IDs and scores
-            results = []
-            for idx in top_indices:
-                if similarities[idx] > 0:  # Only return documents with non-zero similarity
-                    results.append((self.document_ids[idx], float(similarities[idx])))
+            results = list(zip(
+                doc_ids_arr[top_indices].tolist(),
+                similarities[top_indices].tolist()
+            ))
             
             logger.info(f"Keyword search returned {len(results)} results")
             return results
@@ -130,24 +265,26 @@ class KeywordSearchService:
     def get_keywords(self, doc_id: str, top_k: int = 10) -> List[Tuple[str, float]]:
         """Get top keywords for a specific document."""
         try:
-            if doc_id not in self.document_ids:
+            doc_idx = self._doc_index.get(doc_id)
+            if doc_idx is None or self.bm25_matrix is None:
                 return []
             
-            doc_idx = self.document_ids.index(doc_id)
-            doc_vector = self.tfidf_matrix[doc_idx].toarray().flatten()
+            # Work on the row's non-zero entries only
+            row = self.bm25_matrix.getrow(doc_idx)
+            if row.nnz == 0:
+                return []
             
             # Get feature names
             feature_names = self.vectorizer.get_feature_names_out()
             
             # Get top keywords
-            top_indices = np.argsort(doc_vector)[::-1][:top_k]
-            
-            keywords = []
-            for idx in top_indices:
-                if doc_vector[idx] > 0:
-                    keywords.append((feature_names[idx], float(doc_vector[idx])))
+            top_k = min(top_k, row.nnz)
+            if top_k <= 0:
+                return []
+            top = np.argpartition(-row.data, top_k - 1)[:top_k]
+            top = top[np.argsort(-row.data[top], kind='stable')]
             
-            return keywords
+            return [(feature_names[row.indices[i]], float(row.data[i])) for i in top]
         except Exception as e:
             logger.error(f"Error getting keywords for document {doc_id}: {e}")
             return []
@@ -155,34 +292,52 @@ class KeywordSearchService:
     def get_query_keywords(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
         """Get top keywords from a query."""
         try:
-            query_vector = self.vectorizer.transform([query]).toarray().flatten()
-            feature_names = self.vectorizer.get_feature_names_out()
-            
-            top_indices = np.argsort(query_vector)[::-1][:top_k]
+            if self._idf is None:
+                return []
+            query_vector = self.vectorizer.transform([query])
+            top_k = min(top_k, query_vector.nnz)
+            if top_k <= 0:
+                return []
             
-            keywords = []
-            for idx in top_indices:
-                if query_vector[idx] > 0:
-                    keywords.append((feature_names[idx], float(query_vector[idx])))
+            feature_names = self.vectorizer.get_feature_names_out()
             
-            return keywords
+            # Rank the query's non-zero terms by count times idf
+            weights = query_vector.data * self._idf[query_vector.indices]
+            top = np.argsort(-weights, kind='stable')[:top_k]
+            return [
+                (feature_names[query_vector.indices[i]], float(weights[i]))
+                for i in top
+            ]
         except Exception as e:
             logger.error(f"Error getting query keywords: {e}")
             return []
     
-    def rebuild_index(self, documents: List[Tuple[str, str]]):
+    def rebuild_index(self, documents: Iterable[Tuple[str, str]]):
         """Rebuild the entire keyword search index."""
         try:
             logger.info("Rebuilding keyword search index")
             
-            # Clear existing data
-            self.document_ids = []
-            self.documents = []
+            # Consume the iterable once, outside the lock so searches keep running
+            document_ids = []
+            contents = []
+            doc_index = {}
+            for doc_id, content in documents:
+                doc_index[doc_id] = len(document_ids)
+                document_ids.append(doc_id)
+                contents.append(content)
+            doc_ids_arr = np.empty(len(document_ids), dtype=object)
+            doc_ids_arr[:] = document_ids
             
-            # Add all documents
-            self.add_documents_batch(documents)
+            # Swap in the new corpus, then fit the vectorizer a single time
+            with self._index_lock:
+                self.document_ids = document_ids
+                self.documents = contents
+                self._doc_index = doc_index
+                self._doc_ids_arr = doc_ids_arr
+                self._rebuild_bm25_matrix()
+            self.flush()
             
-            logger.info(f"Rebuilt keyword index with {len(documents)} documents")
+            logger.info(f"Rebuilt keyword index with {len(self.documents)} documents")
         except Exception as e:
             logger.error(f"Error rebuilding keyword index: {e}")
             raise
@@ -191,8 +346,9 @@ class KeywordSearchService:
         """Get index statistics."""
         return {
             'total_documents': len(self.documents),
-            'vocabulary_size': len(self.vectorizer.vocabulary_) if self.vectorizer.vocabulary_ else 0,
+            'vocabulary_size': len(getattr(self.vectorizer, 'vocabulary_', None) or {}),
             'max_features': self.vectorizer.max_features,
-            'ngram_range': self.vectorizer.ngram_range
+            'ngram_range': self.vectorizer.ngram_range,
+            'scoring': 'bm25'
         }
 
@@ -1,20 +1,97 @@
 import time
 import psutil
+import numpy as np
 import logging
 from typing import Dict, List, Optional
-from datetime import datetime, timedelta
-from collections import defaultdict, deque
+from datetime import datetime, timedelta, timezone
 import threading
+from ._jit import summarize
 
 logger = logging.getLogger(__name__)
 
+# System snapshots younger than this are reused instead of re-reading psutil
+SNAPSHOT_TTL_S = 1.0
+
+# Serializes psutil calls; several (cpu_percent deltas, getloadavg) keep shared
+# C-level state that is not safe to touch from threads at once without the GIL.
+# Kept apart from the monitor's own locks so recording metrics never waits on it.
+_PSUTIL_LOCK = threading.Lock()
+
+# Searches at or under this latency count as meeting the performance target
+TARGET_RESPONSE_TIME_MS = 200
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def _to_epoch_ns(timestamp: datetime) -> int:
+    """Epoch nanoseconds for a datetime; naive values are taken as UTC."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    # Integer arithmetic keeps full microsecond precision, unlike timestamp()
+    return (timestamp - _EPOCH) // timedelta(microseconds=1) * 1000
+
+class _MetricBuffer:
+    """Fixed-size ring of samples kept as parallel value and timestamp arrays.
+    
+    Timestamps are epoch nanoseconds and assumed to arrive in order, so a
+    time window is found with a binary search instead of a scan.
+    
+    Writers and readers of the same metric share the buffer's own lock. A
+    reader only holds it while copying the arrays, so a snapshot never mixes
+    samples from two writes or sees a wrapped ring half overwritten.
+    """
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.head = 0  # Total samples written; the next slot is head % capacity
+        self.lock = threading.Lock()
+    
+    def append(self, value: float, timestamp_ns: int):
+        """Write a sample over the oldest slot once the ring is full."""
+        with self.lock:
+            slot = self.head % self.capacity
+            self.values[slot] = value
+            self.timestamps[slot] = timestamp_ns
+            self.head += 1
+    
+    def since(self, cutoff_ns: int):
+        """Timestamps and values at or after cutoff_ns, oldest first."""
+        with self.lock:
+            head = self.head
+            if head <= self.capacity:
+                timestamps = self.timestamps[:head].copy()
+                values = self.values[:head].copy()
+            else:
+                # Unroll the ring so samples are contiguous and in time order
+                split = head % self.capacity
+                timestamps = np.concatenate((self.timestamps[split:], self.timestamps[:split]))
+                values = np.concatenate((self.values[split:], self.values[:split]))
+        
+        # The copies are private, so the search and slicing run without the lock
+        start = np.searchsorted(timestamps, cutoff_ns, side='left')
+        return timestamps[start:], values[start:]
+    
+    def clear(self):
+        """Drop all samples."""
+        with self.lock:
+            self.head = 0
+
 class PerformanceMonitor:
     """Performance monitoring service for tracking system metrics."""
     
     def __init__(self, max_history: int = 1000):
         self.max_history = max_history
-        self.metrics_history = defaultdict(lambda: deque(maxlen=max_history))
-        self.lock = threading.Lock()
+        self.metrics_history = {}
+        self.lock = threading.Lock()  # Only guards creating a metric's buffer
+        
+        # Non-blocking CPU readings report usage since the previous call, so prime
+        # both counters; the Process object is kept so its counter persists
+        self._process = psutil.Process()
+        with _PSUTIL_LOCK:
+            psutil.cpu_percent(interval=None)
+            self._process.cpu_percent(interval=None)
+        self._snapshot = (float('-inf'), {})  # (monotonic time, metrics)
         
         # Performance thresholds
         self.thresholds = {
@@ -23,72 +100,110 @@ class PerformanceMonitor:
             'memory_percent': 80,
             'disk_percent': 90
         }
+        self._index_thresholds()
+    
+    def _index_thresholds(self):
+        """Mirror thresholds as fixed-order arrays for the vectorized alert check."""
+        self._thr_names = tuple(self.thresholds)
+        self._thr_vals = np.array([self.thresholds[n] for n in self._thr_names], dtype=np.float64)
     
     def record_metric(self, metric_name: str, value: float, timestamp: Optional[datetime] = None):
         """Record a performance metric."""
+        # An int from time_ns() is all the hot path needs; datetimes are built on read
         if timestamp is None:
-            timestamp = datetime.utcnow()
+            timestamp_ns = time.time_ns()
+        else:
+            timestamp_ns = _to_epoch_ns(timestamp)
         
-        with self.lock:
-            self.metrics_history[metric_name].append({
-                'value': value,
-                'timestamp': timestamp
-            })
+        self._buffer(metric_name).append(value, timestamp_ns)
+    
+    def _buffer(self, metric_name: str) -> _MetricBuffer:
+        """Get a metric's buffer, creating it on first use."""
+        buffer = self.metrics_history.get(metric_name)
+        if buffer is None:
+            with self.lock:
+                buffer = self.metrics_history.setdefault(
+                    metric_name, _MetricBuffer(self.max_history)
+                )
+        return buffer
+    
+    def _metric_window(self, metric_name: str, minutes: int):
+        """Timestamps and values of a metric for the last N minutes, as arrays."""
+        cutoff_ns = time.time_ns() - minutes * 60 * 1_000_000_000
+        
+        buffer = self.metrics_history.get(metric_name)
+        if buffer is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        return buffer.since(cutoff_ns)
     
     def get_metric_history(self, metric_name: str, minutes: int = 60) -> List[Dict]:
         """Get metric history for the last N minutes."""
-        cutoff_time = datetime.utcnow() - timedelta(minutes=minutes)
-        
-        with self.lock:
-            history = list(self.metrics_history[metric_name])
-            return [
-                point for point in history 
-                if point['timestamp'] >= cutoff_time
-            ]
+        timestamps, values = self._metric_window(metric_name, minutes)
+        # The window was found with a binary search; datetime64 converts the
+        # remaining timestamps to naive UTC datetimes in one C-level pass
+        datetimes = timestamps.astype('datetime64[ns]').astype('datetime64[us]').tolist()
+        return [
+            {'value': value, 'timestamp': timestamp}
+            for timestamp, value in zip(datetimes, values.tolist())
+        ]
     
     def get_current_metrics(self) -> Dict:
-        """Get current system metrics."""
+        """Get current system metrics, reusing a snapshot taken within SNAPSHOT_TTL_S."""
+        taken_at, cached = self._snapshot
+        if time.monotonic() - taken_at < SNAPSHOT_TTL_S:
+            return dict(cached)
+        
         try:
-            # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
-            
-            # Memory usage
-            memory = psutil.virtual_memory()
-            memory_percent = memory.percent
-            
-            # Disk usage
-            disk = psutil.disk_usage('/')
-            disk_percent = (disk.used / disk.total) * 100
-            
-            # Network I/O
-            network = psutil.net_io_counters()
-            
-            # Process info
-            process = psutil.Process()
-            process_memory = process.memory_info()
-            
-            metrics = {
-                'timestamp': datetime.utcnow().isoformat(),
-                'cpu_percent': cpu_percent,
-                'memory_percent': memory_percent,
-                'memory_used_mb': memory.used / (1024 * 1024),
-                'memory_available_mb': memory.available / (1024 * 1024),
-                'disk_percent': disk_percent,
-                'disk_used_gb': disk.used / (1024 * 1024 * 1024),
-                'disk_free_gb': disk.free / (1024 * 1024 * 1024),
-                'network_bytes_sent': network.bytes_sent,
-                'network_bytes_recv': network.bytes_recv,
-                'process_memory_mb': process_memory.rss / (1024 * 1024),
-                'process_cpu_percent': process.cpu_percent(),
-                'load_average': psutil.getloadavg()[0] if hasattr(psutil, 'getloadavg') else 0
-            }
+            with _PSUTIL_LOCK:
+                # Another thread may have refreshed the snapshot while we waited
+                taken_at, cached = self._snapshot
+                if time.monotonic() - taken_at < SNAPSHOT_TTL_S:
+                    return dict(cached)
+                
+                # CPU usage since the previous reading; does not sleep
+                cpu_percent = psutil.cpu_percent(interval=None)
+                
+                # Memory usage
+                memory = psutil.virtual_memory()
+                memory_percent = memory.percent
+                
+                # Disk usage
+                disk = psutil.disk_usage('/')
+                disk_percent = (disk.used / disk.total) * 100
+                
+                # Network I/O
+                network = psutil.net_io_counters()
+                
+                # Process info, read from /proc in one pass
+                with self._process.oneshot():
+                    process_memory = self._process.memory_info()
+                    process_cpu_percent = self._process.cpu_percent(interval=None)
+                
+                load_average = psutil.getloadavg()[0] if hasattr(psutil, 'getloadavg') else 0
+                
+                metrics = {
+                    'timestamp': datetime.utcnow().isoformat(),
+                    'cpu_percent': cpu_percent,
+                    'memory_percent': memory_percent,
+                    'memory_used_mb': memory.used / (1024 * 1024),
+                    'memory_available_mb': memory.available / (1024 * 1024),
+                    'disk_percent': disk_percent,
+                    'disk_used_gb': disk.used / (1024 * 1024 * 1024),
+                    'disk_free_gb': disk.free / (1024 * 1024 * 1024),
+                    'network_bytes_sent': network.bytes_sent,
+                    'network_bytes_recv': network.bytes_recv,
+                    'process_memory_mb': process_memory.rss / (1024 * 1024),
+                    'process_cpu_percent': process_cpu_percent,
+                    'load_average': load_average
+                }
+                self._snapshot = (time.monotonic(), metrics)
             
-            # Record metrics
+            # Record metrics outside the psutil lock
             self.record_metric('cpu_percent', cpu_percent)
             self.record_metric('memory_percent', memory_percent)
             self.record_metric('disk_percent', disk_percent)
             
-            return metrics
+            return dict(metrics)
             
         except Exception as e:
             logger.error(f"Error getting current metrics: {e}")
@@ -103,18 +218,18 @@ class PerformanceMonitor:
         }
         
         for metric_name in ['cpu_percent', 'memory_percent', 'disk_percent', 'response_time_ms']:
-            history = self.get_metric_history(metric_name, minutes)
+            _, values = self._metric_window(metric_name, minutes)
             
-            if history:
-                values = [point['value'] for point in history]
+            if values.size:
+                current, average, low, high = summarize(values)[:4]
                 summary['metrics'][metric_name] = {
-                    'current': values[-1] if values else 0,
-                    'average': sum(values) / len(values) if values else 0,
-                    'min': min(values) if values else 0,
-                    'max': max(values) if values else 0,
-                    'count': len(values),
+                    'current': current,
+                    'average': average,
+                    'min': low,
+                    'max': high,
+                    'count': int(values.size),
                     'threshold': self.thresholds.get(metric_name, 0),
-                    'status': self._get_status(values[-1] if values else 0, metric_name)
+                    'status': self._get_status(current, metric_name)
                 }
         
         return summary
@@ -134,28 +249,34 @@ class PerformanceMonitor:
         """Get performance alerts based on thresholds."""
         alerts = []
         current_metrics = self.get_current_metrics()
+        names, thresholds = self._thr_names, self._thr_vals
         
-        for metric_name, threshold in self.thresholds.items():
-            if metric_name in current_metrics:
-                value = current_metrics[metric_name]
-                if value > threshold:
-                    alerts.append({
-                        'metric': metric_name,
-                        'value': value,
-                        'threshold': threshold,
-                        'severity': 'critical',
-                        'message': f'{metric_name} is {value:.1f}%, exceeding threshold of {threshold}%',
-                        'timestamp': datetime.utcnow().isoformat()
-                    })
-                elif value > threshold * 0.8:
-                    alerts.append({
-                        'metric': metric_name,
-                        'value': value,
-                        'threshold': threshold,
-                        'severity': 'warning',
-                        'message': f'{metric_name} is {value:.1f}%, approaching threshold of {threshold}%',
-                        'timestamp': datetime.utcnow().isoformat()
-                    })
+        # Metrics without a current reading are NaN, which never compares greater
+        current = np.array(
+            [current_metrics.get(name, np.nan) for name in names], dtype=np.float64
+        )
+        critical = current > thresholds
+        warning = (current > thresholds * 0.8) & ~critical
+        
+        timestamp = datetime.utcnow().isoformat()
+        for i in np.flatnonzero(critical | warning):
+            metric_name = names[i]
+            value = current_metrics[metric_name]
+            threshold = self.thresholds[metric_name]
+            if critical[i]:
+                severity = 'critical'
+                message = f'{metric_name} is {value:.1f}%, exceeding threshold of {threshold}%'
+            else:
+                severity = 'warning'
+                message = f'{metric_name} is {value:.1f}%, approaching threshold of {threshold}%'
+            alerts.append({
+                'metric': metric_name,
+                'value': value,
+                'threshold': threshold,
+                'severity': severity,
+                'message': message,
+                'timestamp': timestamp
+            })
         
         return alerts
     
@@ -171,46 +292,39 @@ class PerformanceMonitor:
     
     def get_search_performance_stats(self, minutes: int = 60) -> Dict:
         """Get search performance statistics."""
-        response_times = self.get_metric_history('response_time_ms', minutes)
-        result_counts = self.get_metric_history('result_count', minutes)
+        _, rt_values = self._metric_window('response_time_ms', minutes)
+        _, rc_values = self._metric_window('result_count', minutes)
         
-        if not response_times:
+        if not rt_values.size:
             return {}
         
-        rt_values = [point['value'] for point in response_times]
-        rc_values = [point['value'] for point in result_counts]
+        # One compiled pass over the window instead of a reduction per statistic
+        _, rt_avg, rt_min, rt_max, p95, p99, meeting_target = summarize(
+            rt_values, TARGET_RESPONSE_TIME_MS
+        )
         
         return {
             'period_minutes': minutes,
-            'total_searches': len(response_times),
+            'total_searches': int(rt_values.size),
             'response_time': {
-                'average': sum(rt_values) / len(rt_values),
-                'min': min(rt_values),
-                'max': max(rt_values),
-                'p95': self._percentile(rt_values, 95),
-                'p99': self._percentile(rt_values, 99)
+                'average': rt_avg,
+                'min': rt_min,
+                'max': rt_max,
+                'p95': p95,
+                'p99': p99
             },
             'result_count': {
-                'average': sum(rc_values) / len(rc_values) if rc_values else 0,
-                'min': min(rc_values) if rc_values else 0,
-                'max': max(rc_values) if rc_values else 0
+                'average': float(rc_values.mean()) if rc_values.size else 0,
+                'min': float(rc_values.min()) if rc_values.size else 0,
+                'max': float(rc_values.max()) if rc_values.size else 0
             },
             'performance_target': {
-                'target_response_time_ms': 200,
+                'target_response_time_ms': TARGET_RESPONSE_TIME_MS,
                 'target_throughput_qps': 1000,
-                'meeting_target': sum(1 for rt in rt_values if rt <= 200) / len(rt_values) * 100
+                'meeting_target': meeting_target
             }
         }
     
-    def _percentile(self, values: List[float], percentile: int) -> float:
-        """Calculate percentile of values."""
-        if not values:
-            return 0
-        
-        sorted_values = sorted(values)
-        index = int((percentile / 100) * len(sorted_values))
-        return sorted_values[min(index, len(sorted_values) - 1)]
-    
     def get_health_status(self) -> Dict:
         """Get overall health status."""
         alerts = self.get_alerts()
@@ -235,13 +349,15 @@ class PerformanceMonitor:
     def clear_history(self):
         """Clear all metric history."""
         with self.lock:
-            for metric_name in self.metrics_history:
-                self.metrics_history[metric_name].clear()
+            buffers = list(self.metrics_history.values())
+        for buffer in buffers:
+            buffer.clear()
         logger.info("Performance metrics history cleared")
     
     def set_threshold(self, metric_name: str, threshold: float):
         """Set threshold for a metric."""
         self.thresholds[metric_name] = threshold
+        self._index_thresholds()
         logger.info(f"Set threshold for {metric_name}: {threshold}")
     
     def get_thresholds(self) -> Dict:
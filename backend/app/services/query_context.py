@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+
+@dataclass
+class QueryContext:
+    """Per-request query state computed once and shared by the search and cache layers."""
+    query: str
+    embedding: Optional[np.ndarray] = None  # Normalized query embedding
+    cache_key: Optional[str] = None  # Search result cache key
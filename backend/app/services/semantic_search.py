@@ -5,10 +5,44 @@ from sklearn.metrics.pairwise import cosine_similarity
 import logging
 import pickle
 import os
-from typing import List, Dict, Tuple
+import threading
+import atexit
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Concurrent encode_text calls are coalesced into one forward pass of up to
+# ENCODE_BATCH_SIZE texts, waiting at most ENCODE_WINDOW_S for the batch to fill
+ENCODE_BATCH_SIZE = 32
+ENCODE_WINDOW_S = 0.005
+
+# Forward-pass batch size for bulk document encoding
+DOCUMENT_BATCH_SIZE = 64
+
+# Single-document adds are buffered and written to FAISS in batches of this size,
+# or sooner when a search needs them
+ADD_BATCH_SIZE = 256
+
+# Encoded texts kept in an LRU of float16 rows in one preallocated matrix
+EMBEDDING_CACHE_SIZE = 8192
+
+# Exact fp32 search is kept until the index holds SQ_TRAIN_SIZE vectors, enough to
+# estimate per-dimension value ranges; then it is converted to 8-bit scalar
+# quantization, a quarter of the memory and bandwidth per vector
+SQ_TRAIN_SIZE = 256
+SQ_RANGE_MARGIN = 0.2  # Widen trained ranges so later vectors are rarely clipped
+
+# Rebuilds of at least HNSW_MIN_SIZE documents produce an HNSW graph over 8-bit
+# vectors, searched in roughly logarithmic rather than linear time. Building the
+# graph is slow, so it only happens in rebuild_index; later adds extend it.
+HNSW_MIN_SIZE = 10000
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
 class SemanticSearchService:
     """Semantic search using sentence transformers and FAISS."""
     
@@ -18,19 +52,58 @@ class SemanticSearchService:
         self.model = None
         self.index = None
         self.document_ids = []
-        self.embeddings_cache = {}
+        
+        # LRU embedding cache: text -> row of _cache_matrix, least recently used first
+        self._cache_matrix = None
+        self._cache_slots = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        
+        # Documents queued by add_document and not yet in the FAISS index
+        self._pending_doc_ids = []
+        self._pending_vectors = None
+        self._add_lock = threading.Lock()
+        
+        # Pending (text, Future) pairs for the batching encoder thread
+        self._pending = []
+        self._inflight = {}  # text -> Future, so identical concurrent texts encode once
+        self._pending_lock = threading.Lock()
+        self._pending_ready = threading.Event()
+        
+        # Per-thread query vector and FAISS output buffers reused across searches
+        self._tls = threading.local()
+        
+        # Saves requested while one is running collapse into a single later write
+        self._save_requested = threading.Event()
+        self._save_lock = threading.Lock()
+        self._stop_saver = threading.Event()
         
         # Create data directory if it doesn't exist
         os.makedirs(os.path.dirname(index_path), exist_ok=True)
         
         self._load_model()
         self._load_index()
+        dimension = self.model.get_sentence_embedding_dimension()
+        self._cache_matrix = np.empty((EMBEDDING_CACHE_SIZE, dimension), dtype=np.float16)
+        self._pending_vectors = np.empty((ADD_BATCH_SIZE, dimension), dtype=np.float32)
+        
+        self._encoder = threading.Thread(target=self._encode_loop, name='query-encoder', daemon=True)
+        self._encoder.start()
+        
+        self._saver = threading.Thread(target=self._save_loop, name='index-saver', daemon=True)
+        self._saver.start()
+        atexit.register(self.close)
     
     def _load_model(self):
         """Load the sentence transformer model."""
         try:
             logger.info(f"Loading sentence transformer model: {self.model_name}")
             self.model = SentenceTransformer(self.model_name)
+            if self.model.device.type == 'cuda':
+                # Half precision runs on tensor cores and halves host transfers
+                self.model.half()
+                logger.info("Running model in fp16 on CUDA")
             logger.info("Model loaded successfully")
         except Exception as e:
             logger.error(f"Error loading model: {e}")
@@ -40,14 +113,25 @@ class SemanticSearchService:
         """Load or create FAISS index."""
         try:
             index_file = f"{self.index_path}.faiss"
-            ids_file = f"{self.index_path}.pkl"
+            ids_file = f"{self.index_path}.ids.npy"
+            legacy_ids_file = f"{self.index_path}.pkl"
             
-            if os.path.exists(index_file) and os.path.exists(ids_file):
+            if os.path.exists(index_file) and (
+                os.path.exists(ids_file) or os.path.exists(legacy_ids_file)
+            ):
                 logger.info("Loading existing FAISS index")
-                self.index = faiss.read_index(index_file)
-                with open(ids_file, 'rb') as f:
-                    self.document_ids = pickle.load(f)
+                # Map the index file instead of reading it into memory where FAISS supports it
+                self.index = faiss.read_index(index_file, faiss.IO_FLAG_MMAP)
+                if os.path.exists(ids_file):
+                    # Fixed-width strings map without unpickling; the list is needed for appends
+                    self.document_ids = np.load(ids_file, mmap_mode='r').tolist()
+                else:
+                    with open(legacy_ids_file, 'rb') as f:
+                        self.document_ids = pickle.load(f)
                 logger.info(f"Loaded index with {len(self.document_ids)} documents")
+                if isinstance(self.index, faiss.IndexHNSW):
+                    self.index.hnsw.efSearch = HNSW_EF_SEARCH
+                self._maybe_quantize()
             else:
                 logger.info("Creating new FAISS index")
                 # Create a placeholder index - will be updated when documents are added
@@ -59,94 +143,283 @@ class SemanticSearchService:
             raise
     
     def _save_index(self):
-        """Save FAISS index and document IDs."""
+        """Ask the background saver to write the index; returns immediately."""
+        self._save_requested.set()
+    
+    def _save_loop(self):
+        """Write the index whenever a save was requested."""
+        while True:
+            self._save_requested.wait()
+            if self._stop_saver.is_set():
+                return
+            self.flush_saves()
+    
+    def flush_saves(self):
+        """Write the index now if a save is pending."""
+        with self._save_lock:
+            if not self._save_requested.is_set():
+                return
+            self._save_requested.clear()
+            self._write_index()
+    
+    def close(self):
+        """Stop the background saver and write any pending save."""
+        self._stop_saver.set()
+        self.flush_saves()
+        self._save_requested.set()  # Wake the saver so it sees the stop flag
+    
+    def _write_index(self):
+        """Save FAISS index and document IDs, replacing the old files atomically."""
         try:
             index_file = f"{self.index_path}.faiss"
-            ids_file = f"{self.index_path}.pkl"
+            ids_file = f"{self.index_path}.ids.npy"
             
-            faiss.write_index(self.index, index_file)
-            with open(ids_file, 'wb') as f:
-                pickle.dump(self.document_ids, f)
+            # Snapshot under the add lock so the write never sees a half-applied add
+            with self._add_lock:
+                index = faiss.clone_index(self.index)
+                document_ids = np.asarray(self.document_ids, dtype=str)
+            
+            # Write beside the targets and rename, so readers and a memory-mapped
+            # index never see a partial file
+            faiss.write_index(index, f"{index_file}.tmp")
+            with open(f"{ids_file}.tmp", 'wb') as f:
+                np.save(f, document_ids)
+            os.replace(f"{index_file}.tmp", index_file)
+            os.replace(f"{ids_file}.tmp", ids_file)
             logger.info("Index saved successfully")
         except Exception as e:
             logger.error(f"Error saving index: {e}")
     
+    def _maybe_quantize(self):
+        """Convert a flat fp32 index to an int8 scalar quantized one once it is large enough."""
+        if not isinstance(self.index, faiss.IndexFlat) or self.index.ntotal < SQ_TRAIN_SIZE:
+            return
+        
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        index = faiss.IndexScalarQuantizer(
+            self.index.d, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+        )
+        index.sq.rangestat = faiss.ScalarQuantizer.RS_minmax
+        index.sq.rangestat_arg = SQ_RANGE_MARGIN
+        index.train(vectors)
+        index.add(vectors)
+        self.index = index
+        logger.info(f"Quantized semantic index to 8-bit with {index.ntotal} vectors")
+    
+    def _build_hnsw_index(self):
+        """Replace the index with an HNSW graph over 8-bit quantized vectors."""
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        index = faiss.IndexHNSWSQ(
+            self.index.d, faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT
+        )
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        index.train(vectors)
+        index.add(vectors)
+        self.index = index
+        logger.info(f"Built HNSW semantic index with {index.ntotal} vectors")
+    
     def encode_text(self, text: str) -> np.ndarray:
-        """Encode text to embedding vector."""
+        """Encode text to a normalized embedding, batched with concurrent calls."""
         try:
-            if text in self.embeddings_cache:
-                return self.embeddings_cache[text]
+            embedding = self._cache_get(text)
+            if embedding is not None:
+                return embedding
             
-            embedding = self.model.encode([text])[0]
-            self.embeddings_cache[text] = embedding
+            embedding = self._encode_batched(text)
+            self._cache_put(text, embedding)
             return embedding
         except Exception as e:
             logger.error(f"Error encoding text: {e}")
             raise
     
+    def _encode_batched(self, text: str) -> np.ndarray:
+        """Queue text for the encoder thread and wait for its normalized embedding."""
+        with self._pending_lock:
+            future = self._inflight.get(text)
+            if future is None:
+                future = Future()
+                self._inflight[text] = future
+                self._pending.append((text, future))
+        self._pending_ready.set()
+        return future.result()
+    
+    def _cache_get(self, text: str):
+        """Cached embedding for text as float32, or None."""
+        with self._cache_lock:
+            slot = self._cache_slots.get(text)
+            if slot is None:
+                self._cache_misses += 1
+                return None
+            self._cache_hits += 1
+            self._cache_slots.move_to_end(text)
+            return self._cache_matrix[slot].astype(np.float32)
+    
+    def _cache_put(self, text: str, embedding: np.ndarray):
+        """Store an embedding, reusing the least recently used row when full."""
+        with self._cache_lock:
+            slot = self._cache_slots.get(text)
+            if slot is not None:
+                self._cache_slots.move_to_end(text)
+            elif len(self._cache_slots) < EMBEDDING_CACHE_SIZE:
+                slot = len(self._cache_slots)
+            else:
+                _, slot = self._cache_slots.popitem(last=False)
+            self._cache_slots[text] = slot
+            self._cache_matrix[slot] = embedding
+    
+    def _encode_loop(self):
+        """Encode queued texts in batches and resolve their futures."""
+        while True:
+            self._pending_ready.wait()
+            
+            # Give concurrent callers a moment to join unless the batch is already full
+            if len(self._pending) < ENCODE_BATCH_SIZE:
+                time.sleep(ENCODE_WINDOW_S)
+            
+            with self._pending_lock:
+                batch = self._pending[:ENCODE_BATCH_SIZE]
+                self._pending = self._pending[ENCODE_BATCH_SIZE:]
+                if not self._pending:
+                    self._pending_ready.clear()
+            if not batch:
+                continue
+            
+            try:
+                # normalize_embeddings applies the L2 norm inside the model call
+                embeddings = self.model.encode(
+                    [text for text, _ in batch],
+                    batch_size=ENCODE_BATCH_SIZE,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True
+                ).astype(np.float32, copy=False)
+            except Exception as e:
+                self._release_inflight(batch)
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            
+            self._release_inflight(batch)
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+    
+    def _release_inflight(self, batch):
+        """Forget finished texts so later calls go through the cache or a new encode."""
+        with self._pending_lock:
+            for text, _ in batch:
+                self._inflight.pop(text, None)
+    
     def encode_documents(self, documents: List[str]) -> np.ndarray:
-        """Encode multiple documents to embedding vectors."""
+        """Encode multiple documents to L2-normalized embedding vectors."""
         try:
-            embeddings = self.model.encode(documents)
+            embeddings = self.model.encode(
+                documents,
+                batch_size=DOCUMENT_BATCH_SIZE,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
             return embeddings
         except Exception as e:
             logger.error(f"Error encoding documents: {e}")
             raise
     
     def add_document(self, doc_id: str, content: str):
-        """Add a document to the search index."""
+        """Queue a document for the search index; it is written with the next flush."""
         try:
-            # Encode the document
-            embedding = self.encode_text(content)
+            # Encode and normalize the document; document text is not worth caching
+            embedding = self._encode_batched(content)
             
-            # Normalize for cosine similarity
-            embedding = embedding / np.linalg.norm(embedding)
-            
-            # Add to FAISS index
-            self.index.add(embedding.reshape(1, -1))
-            self.document_ids.append(doc_id)
+            with self._add_lock:
+                self._pending_vectors[len(self._pending_doc_ids)] = embedding
+                self._pending_doc_ids.append(doc_id)
+                if len(self._pending_doc_ids) >= ADD_BATCH_SIZE:
+                    self._flush_pending()
             
-            logger.info(f"Added document {doc_id} to semantic index")
+            logger.info(f"Queued document {doc_id} for semantic index")
         except Exception as e:
             logger.error(f"Error adding document {doc_id}: {e}")
             raise
     
+    def flush(self):
+        """Write queued documents to the FAISS index."""
+        with self._add_lock:
+            self._flush_pending()
+    
+    def _flush_pending(self):
+        """Add the queued vectors in one FAISS call; the caller holds _add_lock."""
+        count = len(self._pending_doc_ids)
+        if not count:
+            return
+        
+        # Vectors come from the encoder already L2-normalized
+        self.index.add(self._pending_vectors[:count])
+        self.document_ids.extend(self._pending_doc_ids)
+        self._pending_doc_ids = []
+        self._maybe_quantize()
+        logger.info(f"Added {count} queued documents to semantic index")
+    
     def add_documents_batch(self, documents: List[Tuple[str, str]]):
-        """Add multiple documents to the search index."""
+        """Add multiple (doc_id, content) pairs to the search index."""
+        self.add_documents(
+            [doc_id for doc_id, _ in documents],
+            [content for _, content in documents]
+        )
+    
+    def add_documents(self, doc_ids: Sequence[str], contents: Sequence[str],
+                      embeddings: Optional[np.ndarray] = None):
+        """Add documents given as parallel id and content lists.
+        
+        ``embeddings`` may carry vectors already computed with ``encode_documents``.
+        """
         try:
-            doc_ids, contents = zip(*documents)
-            
-            # Encode all documents
-            embeddings = self.encode_documents(contents)
-            
-            # Normalize for cosine similarity
-            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-            embeddings = embeddings / norms
+            # Encode all documents; they come back normalized, possibly as fp16
+            if embeddings is None:
+                embeddings = self.encode_documents(contents)
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
             
             # Add to FAISS index
-            self.index.add(embeddings)
-            self.document_ids.extend(doc_ids)
+            with self._add_lock:
+                self.index.add(embeddings)
+                self.document_ids.extend(doc_ids)
+                self._maybe_quantize()
             
-            logger.info(f"Added {len(documents)} documents to semantic index")
+            logger.info(f"Added {len(doc_ids)} documents to semantic index")
         except Exception as e:
             logger.error(f"Error adding documents batch: {e}")
             raise
     
-    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
-        """Search for similar documents."""
+    def embed_query(self, query: str) -> np.ndarray:
+        """Encode and normalize a query for searching the index."""
+        return self.encode_text(query)
+    
+    def search(self, query: str, k: int = 10,
+               query_embedding: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
+        """Search for similar documents, reusing query_embedding when the caller has one."""
         try:
+            # Make queued documents searchable
+            if self._pending_doc_ids:
+                self.flush()
+            
             # Encode query
-            query_embedding = self.encode_text(query)
-            query_embedding = query_embedding / np.linalg.norm(query_embedding)
+            if query_embedding is None:
+                query_embedding = self.embed_query(query)
+            
+            # Renormalize a private copy; cached fp16 vectors are only nearly unit length
+            query_vector, scores, indices = self._search_buffers(k)
+            query_vector[0] = query_embedding
+            faiss.normalize_L2(query_vector)
             
-            # Search in FAISS index
-            scores, indices = self.index.search(query_embedding.reshape(1, -1), k)
+            # Search in FAISS index, writing into this thread's output buffers
+            self.index.search(query_vector, k, D=scores, I=indices)
             
-            # Return results with document IDs and scores
-            results = []
-            for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-                if idx < len(self.document_ids):
-                    results.append((self.document_ids[idx], float(score)))
+            # Convert once at C level; FAISS pads missing neighbours with id -1
+            document_ids = self.document_ids
+            count = len(document_ids)
+            results = [
+                (document_ids[idx], score)
+                for idx, score in zip(indices[0].tolist(), scores[0].tolist())
+                if 0 <= idx < count
+            ]
             
             logger.info(f"Semantic search returned {len(results)} results")
             return results
@@ -154,23 +427,108 @@ class SemanticSearchService:
             logger.error(f"Error in semantic search: {e}")
             return []
     
-    def rebuild_index(self, documents: List[Tuple[str, str]]):
-        """Rebuild the entire search index."""
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Normalized embeddings for several queries, encoding cache misses in one call."""
+        embeddings = np.empty(
+            (len(queries), self.model.get_sentence_embedding_dimension()), dtype=np.float32
+        )
+        misses = {}  # query -> rows it fills, so repeated queries encode once
+        for i, query in enumerate(queries):
+            rows = misses.get(query)
+            if rows is not None:
+                rows.append(i)
+                continue
+            cached = self._cache_get(query)
+            if cached is None:
+                misses[query] = [i]
+            else:
+                embeddings[i] = cached
+        
+        if misses:
+            encoded = self.encode_documents(list(misses))
+            for (query, rows), embedding in zip(misses.items(), encoded):
+                embeddings[rows] = embedding
+                self._cache_put(query, embedding)
+        return embeddings
+    
+    def search_batch(self, queries: List[str], k: int = 10) -> List[List[Tuple[str, float]]]:
+        """Search for several queries with one encoder pass and one FAISS call."""
+        try:
+            if not queries:
+                return []
+            
+            # Make queued documents searchable
+            if self._pending_doc_ids:
+                self.flush()
+            
+            query_vectors = self.embed_queries(queries)
+            faiss.normalize_L2(query_vectors)
+            scores, indices = self.index.search(query_vectors, k)
+            
+            document_ids = self.document_ids
+            count = len(document_ids)
+            results = [
+                [
+                    (document_ids[idx], score)
+                    for idx, score in zip(row_indices, row_scores)
+                    if 0 <= idx < count
+                ]
+                for row_indices, row_scores in zip(indices.tolist(), scores.tolist())
+            ]
+            
+            logger.info(f"Semantic batch search of {len(queries)} queries completed")
+            return results
+        except Exception as e:
+            logger.error(f"Error in semantic batch search: {e}")
+            return [[] for _ in queries]
+    
+    def _search_buffers(self, k: int):
+        """This thread's (1, dim) query buffer and (1, k) score and id buffers."""
+        tls = self._tls
+        query_vector = getattr(tls, 'query_vector', None)
+        if query_vector is None:
+            query_vector = np.empty((1, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+            tls.query_vector = query_vector
+            tls.scores = np.empty((1, 0), dtype=np.float32)
+            tls.indices = np.empty((1, 0), dtype=np.int64)
+        if tls.scores.shape[1] < k:
+            tls.scores = np.empty((1, k), dtype=np.float32)
+            tls.indices = np.empty((1, k), dtype=np.int64)
+        # With a single row, the first k columns are still a contiguous array
+        return query_vector, tls.scores[:, :k], tls.indices[:, :k]
+    
+    def rebuild_index(self, documents: Iterable[Tuple[str, str]], batch_size: int = 256):
+        """Rebuild the entire search index, encoding documents in batches."""
         try:
             logger.info("Rebuilding semantic search index")
             
-            # Clear existing index
+            # Clear existing index; queued documents are part of the rebuild input
             dimension = self.model.get_sentence_embedding_dimension()
-            self.index = faiss.IndexFlatIP(dimension)
-            self.document_ids = []
+            with self._add_lock:
+                self.index = faiss.IndexFlatIP(dimension)
+                self.document_ids = []
+                self._pending_doc_ids = []
+            
+            # Add documents a batch at a time so any iterable can be streamed,
+            # filling the id and content lists directly instead of pairs
+            doc_ids, contents = [], []
+            for doc_id, content in documents:
+                doc_ids.append(doc_id)
+                contents.append(content)
+                if len(doc_ids) == batch_size:
+                    self.add_documents(doc_ids, contents)
+                    doc_ids, contents = [], []
+            if doc_ids:
+                self.add_documents(doc_ids, contents)
             
-            # Add all documents
-            self.add_documents_batch(documents)
+            if self.index.ntotal >= HNSW_MIN_SIZE:
+                with self._add_lock:
+                    self._build_hnsw_index()
             
             # Save the new index
             self._save_index()
             
-            logger.info(f"Rebuilt index with {len(documents)} documents")
+            logger.info(f"Rebuilt index with {len(self.document_ids)} documents")
         except Exception as e:
             logger.error(f"Error rebuilding index: {e}")
             raise
@@ -178,9 +536,22 @@ class SemanticSearchService:
     def get_stats(self) -> Dict:
         """Get index statistics."""
         return {
-            'total_documents': len(self.document_ids),
+            'total_documents': len(self.document_ids) + len(self._pending_doc_ids),
             'model_name': self.model_name,
             'embedding_dimension': self.model.get_sentence_embedding_dimension(),
-            'index_type': 'FAISS_IndexFlatIP'
+            'index_type': f"FAISS_{type(self.index).__name__}",
+            'embedding_cache': self._cache_stats()
         }
+    
+    def _cache_stats(self) -> Dict:
+        """Embedding cache occupancy and hit rate, for sizing EMBEDDING_CACHE_SIZE."""
+        with self._cache_lock:
+            lookups = self._cache_hits + self._cache_misses
+            return {
+                'size': len(self._cache_slots),
+                'capacity': EMBEDDING_CACHE_SIZE,
+                'hits': self._cache_hits,
+                'misses': self._cache_misses,
+                'hit_rate': self._cache_hits / lookups if lookups else 0.0
+            }
 
@@ -0,0 +1,49 @@
+import io
+import json
+import logging
+import zlib
+from werkzeug.wrappers import Response
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on an inflated request body, guards against decompression bombs
+MAX_DECOMPRESSED_BYTES = 16 * 1024 * 1024
+
+class GzipRequestMiddleware:
+    """WSGI middleware that inflates gzip-encoded request bodies.
+    
+    Ingestion clients may send large JSON payloads with
+    ``Content-Encoding: gzip``; the body is decompressed before Flask sees
+    it, so views keep calling ``request.get_json()`` unchanged.
+    """
+    
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+    
+    def __call__(self, environ, start_response):
+        if environ.get('HTTP_CONTENT_ENCODING', '').strip().lower() != 'gzip':
+            return self.wsgi_app(environ, start_response)
+        
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        raw = environ['wsgi.input'].read(length) if length else environ['wsgi.input'].read()
+        
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            body = decompressor.decompress(raw, MAX_DECOMPRESSED_BYTES + 1)
+        except zlib.error as e:
+            logger.warning(f"Rejected malformed gzip request body: {e}")
+            return self._error('Malformed gzip request body', 400)(environ, start_response)
+        
+        if len(body) > MAX_DECOMPRESSED_BYTES or decompressor.unconsumed_tail:
+            return self._error('Request body too large', 413)(environ, start_response)
+        if not decompressor.eof:
+            return self._error('Malformed gzip request body', 400)(environ, start_response)
+        
+        environ['wsgi.input'] = io.BytesIO(body)
+        environ['CONTENT_LENGTH'] = str(len(body))
+        del environ['HTTP_CONTENT_ENCODING']
+        return self.wsgi_app(environ, start_response)
+    
+    @staticmethod
+    def _error(message, status):
+        return Response(json.dumps({'error': message}), status=status, mimetype='application/json')
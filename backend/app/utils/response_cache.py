@@ -0,0 +1,139 @@
+import hashlib
+import logging
+import time
+from functools import wraps
+import redis
+from flask import current_app, request
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'resp:'
+
+# Fresh lifetime in seconds for each policy; 'long' follows CACHE_TTL
+CACHE_POLICIES = {
+    'short': 5,
+    'normal': 60,
+    'long': 3600
+}
+
+# How long an expired entry is kept to answer requests whose view fails
+STALE_GRACE_SECONDS = 3600
+
+# Redis client (set by init_response_cache); None disables caching
+redis_client = None
+
+def init_response_cache(app):
+    """Connect the response cache to Redis, leaving it disabled if Redis is unreachable."""
+    global redis_client
+    CACHE_POLICIES['long'] = app.config.get('CACHE_TTL', CACHE_POLICIES['long'])
+    try:
+        client = redis.from_url(
+            app.config['REDIS_URL'],
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5
+        )
+        client.ping()
+        redis_client = client
+        logger.info("Response cache connected to Redis")
+    except Exception as e:
+        redis_client = None
+        logger.warning(f"Response cache disabled, Redis unavailable: {e}")
+
+def _cache_key():
+    return KEY_PREFIX + hashlib.sha1(request.full_path.encode()).hexdigest()
+
+def _read_entry(key):
+    try:
+        entry = redis_client.hgetall(key)
+    except redis.RedisError as e:
+        logger.warning(f"Response cache read failed: {e}")
+        return None
+    return entry or None
+
+def _write_entry(key, response, ttl):
+    try:
+        etag, _ = response.get_etag()
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hset(key, mapping={
+            'body': response.get_data(),
+            'status': response.status_code,
+            'mimetype': response.mimetype,
+            'etag': etag or '',
+            'stale_at': time.time() + ttl
+        })
+        pipe.expire(key, ttl + STALE_GRACE_SECONDS)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Response cache write failed: {e}")
+
+def _entry_response(entry, state):
+    response = current_app.response_class(
+        entry[b'body'],
+        status=int(entry[b'status']),
+        mimetype=entry[b'mimetype'].decode()
+    )
+    if entry.get(b'etag'):
+        response.set_etag(entry[b'etag'].decode())
+    response.headers['X-Cache'] = state
+    return _conditional(response)
+
+def _conditional(response):
+    """Tag a 200 response with an ETag and answer 304 if the client has it."""
+    if response.status_code != 200:
+        return response
+    if not response.get_etag()[0]:
+        response.add_etag()
+    return response.make_conditional(request)
+
+def cached(policy='normal', stale=True):
+    """Cache successful GET responses in Redis, keyed by path and query string.
+    
+    Fresh entries are served without calling the view. Once an entry is past
+    its policy TTL the view runs again, but if it raises or answers with a
+    5xx the expired body is served instead, marked ``X-Cache: stale``. Pass
+    ``stale=False`` for views whose failures must reach the client as-is.
+    
+    Successful responses carry an ETag of their body, stored alongside it,
+    so a matching ``If-None-Match`` gets an empty ``304 Not Modified``.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if redis_client is None:
+                return _conditional(current_app.make_response(view(*args, **kwargs)))
+            
+            key = _cache_key()
+            entry = _read_entry(key)
+            if entry and time.time() < float(entry[b'stale_at']):
+                return _entry_response(entry, 'hit')
+            
+            if not stale:
+                entry = None
+            try:
+                response = current_app.make_response(view(*args, **kwargs))
+            except Exception:
+                if entry:
+                    return _entry_response(entry, 'stale')
+                raise
+            
+            if response.status_code >= 500 and entry:
+                return _entry_response(entry, 'stale')
+            if response.status_code == 200:
+                response.add_etag()
+                _write_entry(key, response, CACHE_POLICIES[policy])
+            response.headers['X-Cache'] = 'miss'
+            return _conditional(response)
+        return wrapper
+    return decorator
+
+def invalidate_response_cache():
+    """Drop every cached response after the underlying documents change."""
+    if redis_client is None:
+        return
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for key in redis_client.scan_iter(match=f'{KEY_PREFIX}*', count=500):
+            pipe.unlink(key)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Response cache invalidation failed: {e}")
@@ -1,235 +1,413 @@
-import json
 import logging
-from typing import List, Dict, Any
+import os
+import textwrap
+import gzip
+from typing import List, Dict, Any, Iterator, Optional
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-import time
+import orjson
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 logger = logging.getLogger(__name__)
 
+# Wikipedia articles fetched at once; low enough to stay clear of rate limits
+WIKI_MAX_WORKERS = 10
+# Retries per URL on rate limiting (honoring Retry-After) and transient server errors
+WIKI_MAX_RETRIES = 3
+WIKI_USER_AGENT = 'ai-search-engine-sample-loader/1.0'
+
+# Summaries come from the MediaWiki API, this many titles per request (the
+# TextExtracts limit for intro extracts); full HTML is only fetched for pages
+# whose intro is shorter than WIKI_MIN_EXTRACT_CHARS
+WIKI_API_URL = 'https://en.wikipedia.org/w/api.php'
+WIKI_HTML_URL = 'https://en.wikipedia.org/api/rest_v1/page/html/'
+WIKI_TITLES_PER_REQUEST = 20
+WIKI_MIN_EXTRACT_CHARS = 1500
+
+# Saved datasets are gzip-compressed JSON; loading also accepts plain JSON
+DATASET_GZIP_LEVEL = 3
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Wikipedia responses are cached on disk so repeat runs skip the network
+WIKI_CACHE_PATH = './data/wiki_cache'
+WIKI_CACHE_EXPIRE_S = 86400
+
+def _paragraph_text(html: str) -> str:
+    """Text of every non-empty <p> in an HTML page, joined by single spaces.
+    
+    Uses selectolax's C parser when it is installed and falls back to
+    BeautifulSoup's pure-Python one otherwise.
+    """
+    if HTMLParser is not None:
+        paragraphs = [node.text(deep=True).strip() for node in HTMLParser(html).css('p')]
+    else:
+        paragraphs = [p.get_text().strip() for p in BeautifulSoup(html, 'html.parser').find_all('p')]
+    # One join over the collected parts sizes the result once
+    return ' '.join(filter(None, paragraphs))
+
+def _topic_slug(topic: str) -> str:
+    """Case- and spacing-insensitive key for a Wikipedia topic."""
+    return topic.strip().lower().replace(' ', '_')
+
+def _prepare(documents):
+    """Freeze static sample documents with their content cleaned once, at import."""
+    return tuple(
+        {**doc, 'content': '\n'.join(
+            line.rstrip() for line in textwrap.dedent(doc['content']).strip().splitlines()
+        )}
+        for doc in documents
+    )
+
+# Static sample documents; the loaders hand out shallow copies since callers
+# add ids and timestamps to each document
+_TECH_ARTICLES = _prepare([
+    {
+        'title': 'Introduction to Machine Learning',
+        'content': '''
+        Machine learning is a subset of artificial intelligence that focuses on algorithms 
+        that can learn from data without being explicitly programmed. It involves training 
+        models on datasets to make predictions or decisions. Common types include supervised 
+        learning, unsupervised learning, and reinforcement learning. Popular algorithms 
+        include linear regression, decision trees, neural networks, and support vector machines.
+        Applications range from image recognition to natural language processing.
+        ''',
+        'metadata': {
+            'category': 'AI/ML',
+            'difficulty': 'beginner',
+            'tags': ['machine learning', 'AI', 'algorithms', 'data science']
+        }
+    },
+    {
+        'title': 'Web Development with React',
+        'content': '''
+        React is a JavaScript library for building user interfaces, particularly web applications. 
+        It uses a component-based architecture and virtual DOM for efficient rendering. React 
+        applications are built using JSX, a syntax extension that allows HTML-like code in 
+        JavaScript. Key concepts include components, props, state, hooks, and lifecycle methods. 
+        React is often used with other libraries like Redux for state management and React Router 
+        for navigation.
+        ''',
+        'metadata': {
+            'category': 'Web Development',
+            'difficulty': 'intermediate',
+            'tags': ['react', 'javascript', 'frontend', 'web development']
+        }
+    },
+    {
+        'title': 'Database Design Principles',
+        'content': '''
+        Database design involves creating an efficient and logical structure for storing data. 
+        Key principles include normalization to reduce redundancy, proper indexing for performance, 
+        and establishing relationships between tables. Common database types include relational 
+        databases like MySQL and PostgreSQL, NoSQL databases like MongoDB, and graph databases 
+        like Neo4j. Design considerations include scalability, consistency, and query performance.
+        ''',
+        'metadata': {
+            'category': 'Database',
+            'difficulty': 'intermediate',
+            'tags': ['database', 'SQL', 'design', 'normalization']
+        }
+    },
+    {
+        'title': 'Cloud Computing Architecture',
+        'content': '''
+        Cloud computing provides on-demand access to computing resources over the internet. 
+        It includes Infrastructure as a Service (IaaS), Platform as a Service (PaaS), and 
+        Software as a Service (SaaS). Major cloud providers include AWS, Google Cloud, and 
+        Microsoft Azure. Benefits include scalability, cost-effectiveness, and flexibility. 
+        Key concepts include virtualization, containerization, microservices, and serverless 
+        computing.
+        ''',
+        'metadata': {
+            'category': 'Cloud Computing',
+            'difficulty': 'intermediate',
+            'tags': ['cloud', 'AWS', 'Azure', 'microservices', 'serverless']
+        }
+    },
+    {
+        'title': 'Python Programming Best Practices',
+        'content': '''
+        Python is a versatile programming language known for its readability and simplicity. 
+        Best practices include following PEP 8 style guidelines, using virtual environments, 
+        writing comprehensive tests, and documenting code properly. Key features include dynamic 
+        typing, extensive standard library, and strong community support. Popular frameworks 
+        include Django for web development, Flask for APIs, and Pandas for data analysis.
+        ''',
+        'metadata': {
+            'category': 'Programming',
+            'difficulty': 'beginner',
+            'tags': ['python', 'programming', 'best practices', 'frameworks']
+        }
+    }
+])
+
+_ACADEMIC_PAPERS = _prepare([
+    {
+        'title': 'Attention Is All You Need',
+        'content': '''
+        The dominant sequence transduction models are based on complex recurrent or convolutional 
+        neural networks that include an encoder and a decoder. The best performing models also 
+        connect the encoder and decoder through an attention mechanism. We propose a new simple 
+        network architecture, the Transformer, based solely on attention mechanisms, dispensing 
+        with recurrence and convolutions entirely. Experiments on two machine translation tasks 
+        show these models to be superior in quality while being more parallelizable and requiring 
+        significantly less time to train.
+        ''',
+        'metadata': {
+            'authors': ['Vaswani et al.'],
+            'year': 2017,
+            'venue': 'NIPS',
+            'category': 'NLP',
+            'tags': ['transformer', 'attention', 'machine translation', 'neural networks']
+        }
+    },
+    {
+        'title': 'BERT: Pre-training of Deep Bidirectional Transformers',
+        'content': '''
+        We introduce a new language representation model called BERT, which stands for 
+        Bidirectional Encoder Representations from Transformers. Unlike recent language 
+        representation models, BERT is designed to pre-train deep bidirectional representations 
+        from unlabeled text by jointly conditioning on both left and right context in all layers. 
+        As a result, the pre-trained BERT model can be fine-tuned with just one additional output 
+        layer to create state-of-the-art models for a wide range of tasks.
+        ''',
+        'metadata': {
+            'authors': ['Devlin et al.'],
+            'year': 2018,
+            'venue': 'NAACL',
+            'category': 'NLP',
+            'tags': ['BERT', 'transformer', 'pre-training', 'language model']
+        }
+    }
+])
+
+_ECOMMERCE_PRODUCTS = _prepare([
+    {
+        'title': 'Wireless Bluetooth Headphones',
+        'content': '''
+        High-quality wireless Bluetooth headphones with noise cancellation technology. 
+        Features include 30-hour battery life, quick charge capability, premium sound 
+        quality, and comfortable over-ear design. Compatible with all Bluetooth devices. 
+        Perfect for music lovers, gamers, and professionals who need reliable audio 
+        equipment. Includes carrying case and charging cable.
+        ''',
+        'metadata': {
+            'category': 'Electronics',
+            'price': 199.99,
+            'brand': 'AudioTech',
+            'rating': 4.5,
+            'tags': ['headphones', 'bluetooth', 'wireless', 'audio']
+        }
+    },
+    {
+        'title': 'Smart Fitness Tracker Watch',
+        'content': '''
+        Advanced fitness tracker with heart rate monitoring, GPS tracking, and sleep analysis. 
+        Water-resistant design suitable for swimming and outdoor activities. Tracks steps, 
+        calories burned, and workout intensity. Features include smartphone notifications, 
+        music control, and customizable watch faces. Battery lasts up to 7 days with 
+        normal use.
+        ''',
+        'metadata': {
+            'category': 'Wearables',
+            'price': 149.99,
+            'brand': 'FitTech',
+            'rating': 4.3,
+            'tags': ['fitness', 'watch', 'tracker', 'health']
+        }
+    }
+])
+
+# Topics fetched from Wikipedia when the static documents are not enough
+WIKI_TOPICS = (
+    'Artificial Intelligence', 'Machine Learning', 'Deep Learning',
+    'Natural Language Processing', 'Computer Vision', 'Robotics',
+    'Web Development', 'Mobile Development', 'Cloud Computing',
+    'Cybersecurity', 'Data Science', 'Blockchain',
+    'Python Programming', 'JavaScript', 'React Framework',
+    'Database Management', 'DevOps', 'Microservices'
+)
+
 class SampleDataLoader:
     """Load sample data for testing the search engine."""
     
     def __init__(self):
         self.sample_documents = []
+        self.session = self._create_session()
+    
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """HTTP session that keeps connections to Wikipedia alive across fetches.
+        
+        With requests-cache installed, responses are also kept in an SQLite
+        cache for a day and revalidated with the server's cache headers.
+        """
+        if requests_cache is not None:
+            os.makedirs(os.path.dirname(WIKI_CACHE_PATH), exist_ok=True)
+            session = requests_cache.CachedSession(
+                WIKI_CACHE_PATH,
+                backend='sqlite',
+                expire_after=WIKI_CACHE_EXPIRE_S,
+                cache_control=True
+            )
+        else:
+            session = requests.Session()
+        retry = Retry(
+            total=WIKI_MAX_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False
+        )
+        # Enough pooled connections for every concurrent fetch
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=retry)
+        session.mount('https://', adapter)
+        session.headers.update({
+            'User-Agent': WIKI_USER_AGENT,
+            'Accept-Encoding': 'gzip'
+        })
+        return session
     
     def load_wikipedia_articles(self, topics: List[str], max_articles: int = 50) -> List[Dict[str, Any]]:
         """Load Wikipedia articles as sample documents."""
-        documents = []
+        topics = topics[:max_articles]
+        if not topics:
+            return []
+        
+        # Aliases like "Machine Learning" and "machine_learning" share one lookup
+        unique = {}
+        for topic in topics:
+            unique.setdefault(_topic_slug(topic), topic)
+        summaries = self._fetch_summaries_batch(list(unique.values()))
+        
+        # Topics that redirect to the same page fetch its HTML only once
+        by_title = {}
+        for topic in unique.values():
+            if topic in summaries:
+                by_title.setdefault(summaries[topic].get('title', topic), topic)
+        found = list(by_title.values())
+        if not found:
+            return []
         
-        for topic in topics[:max_articles]:
+        # HTML fetches are network bound, so a few run at once; results keep topic order
+        with ThreadPoolExecutor(max_workers=min(WIKI_MAX_WORKERS, len(found))) as pool:
+            results = list(pool.map(
+                lambda topic: self._load_wikipedia_article(topic, summaries[topic]), found
+            ))
+        
+        documents = [document for document in results if document is not None]
+        # One summary line instead of a log call per article from every worker
+        logger.info(f"Loaded {len(documents)}/{len(topics)} Wikipedia articles")
+        return documents
+    
+    def _fetch_summaries_batch(self, topics: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Summaries of existing pages keyed by topic, many titles per API request."""
+        summaries = {}
+        for start in range(0, len(topics), WIKI_TITLES_PER_REQUEST):
+            batch = topics[start:start + WIKI_TITLES_PER_REQUEST]
             try:
-                # Get Wikipedia article
-                url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{topic.replace(' ', '_')}"
-                response = requests.get(url, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Get full article content
-                    content_url = f"https://en.wikipedia.org/api/rest_v1/page/html/{topic.replace(' ', '_')}"
-                    content_response = requests.get(content_url, timeout=10)
-                    
-                    content = ""
-                    if content_response.status_code == 200:
-                        soup = BeautifulSoup(content_response.text, 'html.parser')
-                        # Extract text content
-                        for p in soup.find_all('p'):
-                            content += p.get_text() + " "
-                    
-                    document = {
-                        'title': data.get('title', topic),
-                        'content': content.strip() or data.get('extract', ''),
-                        'metadata': {
-                            'source': 'wikipedia',
-                            'url': data.get('content_urls', {}).get('desktop', {}).get('page', ''),
-                            'thumbnail': data.get('thumbnail', {}).get('source', ''),
-                            'description': data.get('description', ''),
-                            'topic': topic
-                        }
-                    }
-                    
-                    documents.append(document)
-                    logger.info(f"Loaded Wikipedia article: {topic}")
-                    
-                time.sleep(1)  # Be respectful to Wikipedia API
-                
+                response = self.session.get(WIKI_API_URL, params={
+                    'action': 'query',
+                    'format': 'json',
+                    'formatversion': 2,
+                    'redirects': 1,
+                    'prop': 'extracts|pageimages|description|info',
+                    'exintro': 1,
+                    'explaintext': 1,
+                    'exlimit': 'max',
+                    'piprop': 'thumbnail',
+                    'pithumbsize': 320,
+                    'inprop': 'url',
+                    'titles': '|'.join(batch)
+                }, timeout=10)
+                response.raise_for_status()
+                query = response.json().get('query', {})
             except Exception as e:
-                logger.error(f"Error loading Wikipedia article for {topic}: {e}")
+                logger.error(f"Error loading Wikipedia summaries for {batch}: {e}")
                 continue
-        
-        return documents
+            
+            # Follow title normalization and redirects from each topic to its page
+            renames = {
+                rename['from']: rename['to']
+                for rename in query.get('normalized', []) + query.get('redirects', [])
+            }
+            pages = {
+                page['title']: page for page in query.get('pages', [])
+                if not page.get('missing') and not page.get('invalid')
+            }
+            for topic in batch:
+                title = topic
+                for _ in range(len(renames)):
+                    if title not in renames:
+                        break
+                    title = renames[title]
+                if title in pages:
+                    summaries[topic] = pages[title]
+        return summaries
     
-    def load_tech_articles(self) -> List[Dict[str, Any]]:
-        """Load sample technology articles."""
-        tech_articles = [
-            {
-                'title': 'Introduction to Machine Learning',
-                'content': '''
-                Machine learning is a subset of artificial intelligence that focuses on algorithms 
-                that can learn from data without being explicitly programmed. It involves training 
-                models on datasets to make predictions or decisions. Common types include supervised 
-                learning, unsupervised learning, and reinforcement learning. Popular algorithms 
-                include linear regression, decision trees, neural networks, and support vector machines.
-                Applications range from image recognition to natural language processing.
-                ''',
-                'metadata': {
-                    'category': 'AI/ML',
-                    'difficulty': 'beginner',
-                    'tags': ['machine learning', 'AI', 'algorithms', 'data science']
-                }
-            },
-            {
-                'title': 'Web Development with React',
-                'content': '''
-                React is a JavaScript library for building user interfaces, particularly web applications. 
-                It uses a component-based architecture and virtual DOM for efficient rendering. React 
-                applications are built using JSX, a syntax extension that allows HTML-like code in 
-                JavaScript. Key concepts include components, props, state, hooks, and lifecycle methods. 
-                React is often used with other libraries like Redux for state management and React Router 
-                for navigation.
-                ''',
-                'metadata': {
-                    'category': 'Web Development',
-                    'difficulty': 'intermediate',
-                    'tags': ['react', 'javascript', 'frontend', 'web development']
-                }
-            },
-            {
-                'title': 'Database Design Principles',
-                'content': '''
-                Database design involves creating an efficient and logical structure for storing data. 
-                Key principles include normalization to reduce redundancy, proper indexing for performance, 
-                and establishing relationships between tables. Common database types include relational 
-                databases like MySQL and PostgreSQL, NoSQL databases like MongoDB, and graph databases 
-                like Neo4j. Design considerations include scalability, consistency, and query performance.
-                ''',
-                'metadata': {
-                    'category': 'Database',
-                    'difficulty': 'intermediate',
-                    'tags': ['database', 'SQL', 'design', 'normalization']
-                }
-            },
-            {
-                'title': 'Cloud Computing Architecture',
-                'content': '''
-                Cloud computing provides on-demand access to computing resources over the internet. 
-                It includes Infrastructure as a Service (IaaS), Platform as a Service (PaaS), and 
-                Software as a Service (SaaS). Major cloud providers include AWS, Google Cloud, and 
-                Microsoft Azure. Benefits include scalability, cost-effectiveness, and flexibility. 
-                Key concepts include virtualization, containerization, microservices, and serverless 
-                computing.
-                ''',
-                'metadata': {
-                    'category': 'Cloud Computing',
-                    'difficulty': 'intermediate',
-                    'tags': ['cloud', 'AWS', 'Azure', 'microservices', 'serverless']
-                }
-            },
-            {
-                'title': 'Python Programming Best Practices',
-                'content': '''
-                Python is a versatile programming language known for its readability and simplicity. 
-                Best practices include following PEP 8 style guidelines, using virtual environments, 
-                writing comprehensive tests, and documenting code properly. Key features include dynamic 
-                typing, extensive standard library, and strong community support. Popular frameworks 
-                include Django for web development, Flask for APIs, and Pandas for data analysis.
-                ''',
+    def _load_wikipedia_article(self, topic: str, summary: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build one Wikipedia document, or None if it could not be loaded."""
+        title = summary.get('title', topic)
+        # The resolved page title skips the redirect; quoting keeps '/', '#' and '?' in the path
+        content_url = WIKI_HTML_URL + quote(title.replace(' ', '_'), safe='')
+        
+        try:
+            extract = summary.get('extract', '')
+            content = extract
+            
+            # Short intros are not worth indexing alone; get the full article for those
+            if len(extract) < WIKI_MIN_EXTRACT_CHARS:
+                content_response = self.session.get(content_url, timeout=10)
+                if content_response.status_code == 200:
+                    content = _paragraph_text(content_response.text) or extract
+            
+            document = {
+                'title': title,
+                'content': content,
                 'metadata': {
-                    'category': 'Programming',
-                    'difficulty': 'beginner',
-                    'tags': ['python', 'programming', 'best practices', 'frameworks']
+                    'source': 'wikipedia',
+                    'url': summary.get('fullurl', ''),
+                    'thumbnail': summary.get('thumbnail', {}).get('source', ''),
+                    'description': summary.get('description', ''),
+                    'topic': topic
                 }
             }
-        ]
-        
-        return tech_articles
+            
+            return document
+            
+        except Exception as e:
+            logger.error(f"Error loading Wikipedia article for {topic}: {e}")
+            return None
+    
+    def load_tech_articles(self) -> List[Dict[str, Any]]:
+        """Load sample technology articles."""
+        return [dict(doc) for doc in _TECH_ARTICLES]
     
     def load_academic_papers(self) -> List[Dict[str, Any]]:
         """Load sample academic paper abstracts."""
-        papers = [
-            {
-                'title': 'Attention Is All You Need',
-                'content': '''
-                The dominant sequence transduction models are based on complex recurrent or convolutional 
-                neural networks that include an encoder and a decoder. The best performing models also 
-                connect the encoder and decoder through an attention mechanism. We propose a new simple 
-                network architecture, the Transformer, based solely on attention mechanisms, dispensing 
-                with recurrence and convolutions entirely. Experiments on two machine translation tasks 
-                show these models to be superior in quality while being more parallelizable and requiring 
-                significantly less time to train.
-                ''',
-                'metadata': {
-                    'authors': ['Vaswani et al.'],
-                    'year': 2017,
-                    'venue': 'NIPS',
-                    'category': 'NLP',
-                    'tags': ['transformer', 'attention', 'machine translation', 'neural networks']
-                }
-            },
-            {
-                'title': 'BERT: Pre-training of Deep Bidirectional Transformers',
-                'content': '''
-                We introduce a new language representation model called BERT, which stands for 
-                Bidirectional Encoder Representations from Transformers. Unlike recent language 
-                representation models, BERT is designed to pre-train deep bidirectional representations 
-                from unlabeled text by jointly conditioning on both left and right context in all layers. 
-                As a result, the pre-trained BERT model can be fine-tuned with just one additional output 
-                layer to create state-of-the-art models for a wide range of tasks.
-                ''',
-                'metadata': {
-                    'authors': ['Devlin et al.'],
-                    'year': 2018,
-                    'venue': 'NAACL',
-                    'category': 'NLP',
-                    'tags': ['BERT', 'transformer', 'pre-training', 'language model']
-                }
-            }
-        ]
-        
-        return papers
+        return [dict(doc) for doc in _ACADEMIC_PAPERS]
     
     def load_ecommerce_products(self) -> List[Dict[str, Any]]:
         """Load sample e-commerce product descriptions."""
-        products = [
-            {
-                'title': 'Wireless Bluetooth Headphones',
-                'content': '''
-                High-quality wireless Bluetooth headphones with noise cancellation technology. 
-                Features include 30-hour battery life, quick charge capability, premium sound 
-                quality, and comfortable over-ear design. Compatible with all Bluetooth devices. 
-                Perfect for music lovers, gamers, and professionals who need reliable audio 
-                equipment. Includes carrying case and charging cable.
-                ''',
-                'metadata': {
-                    'category': 'Electronics',
-                    'price': 199.99,
-                    'brand': 'AudioTech',
-                    'rating': 4.5,
-                    'tags': ['headphones', 'bluetooth', 'wireless', 'audio']
-                }
-            },
-            {
-                'title': 'Smart Fitness Tracker Watch',
-                'content': '''
-                Advanced fitness tracker with heart rate monitoring, GPS tracking, and sleep analysis. 
-                Water-resistant design suitable for swimming and outdoor activities. Tracks steps, 
-                calories burned, and workout intensity. Features include smartphone notifications, 
-                music control, and customizable watch faces. Battery lasts up to 7 days with 
-                normal use.
-                ''',
-                'metadata': {
-                    'category': 'Wearables',
-                    'price': 149.99,
-                    'brand': 'FitTech',
-                    'rating': 4.3,
-                    'tags': ['fitness', 'watch', 'tracker', 'health']
-                }
-            }
-        ]
-        
-        return products
+        return [dict(doc) for doc in _ECOMMERCE_PRODUCTS]
     
     def generate_sample_dataset(self, size: int = 100) -> List[Dict[str, Any]]:
         """Generate a comprehensive sample dataset."""
@@ -237,39 +415,37 @@ class SampleDataLoader:
         
         all_documents = []
         
-        # Load different types of documents
-        all_documents.extend(self.load_tech_articles())
-        all_documents.extend(self.load_academic_papers())
-        all_documents.extend(self.load_ecommerce_products())
+        # Load different types of documents, stopping once there are enough
+        for load in (self.load_tech_articles, self.load_academic_papers, self.load_ecommerce_products):
+            if len(all_documents) >= size:
+                break
+            all_documents.extend(load())
+        del all_documents[size:]
         
-        # Add Wikipedia articles if more documents are needed
-        if len(all_documents) < size:
-            tech_topics = [
-                'Artificial Intelligence', 'Machine Learning', 'Deep Learning',
-                'Natural Language Processing', 'Computer Vision', 'Robotics',
-                'Web Development', 'Mobile Development', 'Cloud Computing',
-                'Cybersecurity', 'Data Science', 'Blockchain',
-                'Python Programming', 'JavaScript', 'React Framework',
-                'Database Management', 'DevOps', 'Microservices'
-            ]
-            
-            wiki_docs = self.load_wikipedia_articles(tech_topics, size - len(all_documents))
+        # Add Wikipedia articles if more documents are needed, fetching only that many
+        needed = size - len(all_documents)
+        if needed > 0:
+            wiki_docs = self.load_wikipedia_articles(list(WIKI_TOPICS), max_articles=needed)
             all_documents.extend(wiki_docs)
         
-        # Add timestamps
+        # Add timestamps; the whole dataset is generated at one moment
+        now = datetime.utcnow().isoformat()
         for i, doc in enumerate(all_documents):
-            doc['created_at'] = datetime.utcnow().isoformat()
-            doc['updated_at'] = datetime.utcnow().isoformat()
+            doc['created_at'] = doc['updated_at'] = now
             doc['id'] = f"sample_doc_{i+1}"
         
         logger.info(f"Generated {len(all_documents)} sample documents")
-        return all_documents[:size]
+        return all_documents
     
     def save_sample_dataset(self, documents: List[Dict[str, Any]], filename: str = "sample_dataset.json"):
-        """Save sample dataset to JSON file."""
+        """Save sample dataset to a gzip-compressed JSON file (``.gz`` is appended if missing)."""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(documents, f, indent=2, ensure_ascii=False)
+            if not filename.endswith('.gz'):
+                filename += '.gz'
+            # orjson serializes to UTF-8 bytes in C; a low gzip level keeps saves fast
+            # while still shrinking the mostly English text several times over
+            with gzip.open(filename, 'wb', compresslevel=DATASET_GZIP_LEVEL) as f:
+                f.write(orjson.dumps(documents, option=orjson.OPT_NON_STR_KEYS))
             logger.info(f"Sample dataset saved to {filename}")
         except Exception as e:
             logger.error(f"Error saving sample dataset: {e}")
@@ -277,11 +453,29 @@ class SampleDataLoader:
     def load_sample_dataset(self, filename: str = "sample_dataset.json") -> List[Dict[str, Any]]:
         """Load sample dataset from JSON file."""
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                documents = json.load(f)
+            documents = list(self.iter_sample_dataset(filename))
             logger.info(f"Loaded {len(documents)} documents from {filename}")
             return documents
         except Exception as e:
             logger.error(f"Error loading sample dataset: {e}")
             return []
+    
+    def iter_sample_dataset(self, filename: str = "sample_dataset.json") -> Iterator[Dict[str, Any]]:
+        """Yield documents from a sample dataset file one at a time.
+        
+        With ijson installed the file is parsed incrementally, so only one
+        document is held in memory at once; otherwise it is parsed whole.
+        Gzip-compressed files are detected by their magic bytes, and a
+        missing ``filename`` falls back to ``filename.gz``.
+        """
+        if not os.path.exists(filename) and os.path.exists(filename + '.gz'):
+            filename += '.gz'
+        
+        with open(filename, 'rb') as raw:
+            f = gzip.GzipFile(fileobj=raw) if raw.read(2) == GZIP_MAGIC else raw
+            raw.seek(0)
+            if ijson is not None:
+                yield from ijson.items(f, 'item', use_float=True)
+            else:
+                yield from orjson.loads(f.read())
 
@@ -0,0 +1,33 @@
+"""Gunicorn configuration for the AI Search Engine backend.
+
+Run with: gunicorn -c gunicorn_conf.py wsgi:app
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Request handlers are mostly waiting on MongoDB and Redis, and PyMongo,
+# Redis, FAISS and the embedding model all release the GIL while they wait or
+# compute, so a pool of real threads per worker serves requests concurrently.
+# gevent is deliberately not used: its monkey-patching turns the search
+# services' threads (the query encoder, the hybrid search pool, per-thread
+# query buffers) into greenlets, and a CPU-bound encode would then block
+# every request on the worker.
+worker_class = 'gthread'
+# HybridSearchService sizes its search pool from the same variable
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+
+# Each worker loads its own embedding model and in-memory search index, and
+# those indexes are not shared between processes. Default to one worker so
+# every request sees the same index; raise WEB_CONCURRENCY (e.g. to
+# 2 * CPU + 1) only once indexes are shared or rebuilt per worker.
+workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+
+keepalive = 5
+# Model loading at worker boot can take a while
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = 30
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'info').lower()
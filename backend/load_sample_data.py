@@ -3,12 +3,18 @@
 Sample Data Loading Script for AI Search Engine
 
 This script loads sample data into the search engine for testing and demonstration purposes.
+Set SAMPLE_DATASET_FILE to stream documents from a dataset written by
+SampleDataLoader.save_sample_dataset instead of generating them.
 """
 
 import os
 import sys
 import logging
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
 
 # Add the backend directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -26,6 +32,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Documents per insert_many call when loading into MongoDB
+INSERT_BATCH_SIZE = 500
+
+def insert_documents(database, documents):
+    """Insert one batch of documents; returns (id, content) for those that were stored."""
+    docs = [
+        {'title': doc['title'], 'content': doc['content'], 'metadata': doc.get('metadata', {})}
+        for doc in documents
+    ]
+    # Ids are assigned up front so the documents that did insert are known on partial failure
+    doc_ids = [str(ObjectId()) for _ in docs]
+    failed = set()
+    
+    try:
+        database.add_documents_many(docs, doc_ids)
+    except BulkWriteError as e:
+        for error in e.details.get('writeErrors', []):
+            failed.add(error['index'])
+            logger.error(f"Error loading document {error['index']}: {error.get('errmsg')}")
+    
+    return [
+        (doc_id, doc['content'])
+        for i, (doc_id, doc) in enumerate(zip(doc_ids, docs))
+        if i not in failed
+    ]
+
 def load_sample_data():
     """Load sample data into the search engine."""
     try:
@@ -46,62 +78,57 @@ def load_sample_data():
         
         logger.info("Services initialized successfully")
         
-        # Generate sample data
-        logger.info("Generating sample data...")
-        sample_documents = data_loader.generate_sample_dataset(size=50)
-        
-        if not sample_documents:
-            logger.error("No sample documents generated")
-            return False
-        
-        logger.info(f"Generated {len(sample_documents)} sample documents")
+        # Stream a saved dataset when one is given, otherwise generate sample data
+        dataset_file = os.getenv('SAMPLE_DATASET_FILE')
+        if dataset_file:
+            logger.info(f"Streaming sample data from {dataset_file}...")
+            sample_documents = data_loader.iter_sample_dataset(dataset_file)
+        else:
+            logger.info("Generating sample data...")
+            sample_documents = data_loader.generate_sample_dataset(size=50)
+            
+            if not sample_documents:
+                logger.error("No sample documents generated")
+                return False
+            
+            logger.info(f"Generated {len(sample_documents)} sample documents")
         
         # Clear existing data (optional)
         clear_existing = input("Clear existing documents? (y/N): ").lower().strip()
         if clear_existing == 'y':
             logger.info("Clearing existing documents...")
             # Note: In production, you'd want to be more careful about this
-            all_docs = database.get_all_documents()
-            for doc in all_docs:
-                database.delete_document(doc['_id'])
-            logger.info("Existing documents cleared")
+            deleted = database.clear_documents()
+            logger.info(f"Existing documents cleared ({deleted} removed)")
         
-        # Load documents into database
+        # Load documents into database with unordered bulk inserts, a batch at a time
         logger.info("Loading documents into database...")
         loaded_docs = []
-        
-        for i, doc in enumerate(sample_documents):
-            try:
-                # Add to database
-                doc_id = database.add_document(
-                    title=doc['title'],
-                    content=doc['content'],
-                    metadata=doc.get('metadata', {})
-                )
-                
-                loaded_docs.append((doc_id, doc['content']))
-                
-                if (i + 1) % 10 == 0:
-                    logger.info(f"Loaded {i + 1}/{len(sample_documents)} documents")
-                    
-            except Exception as e:
-                logger.error(f"Error loading document {i}: {e}")
-                continue
+        documents = iter(sample_documents)
+        while True:
+            batch = list(islice(documents, INSERT_BATCH_SIZE))
+            if not batch:
+                break
+            loaded_docs.extend(insert_documents(database, batch))
+            # Skip formatting the progress line entirely when INFO is disabled
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Inserted {len(loaded_docs)} documents so far")
+        
+        if not loaded_docs:
+            logger.error("No sample documents loaded")
+            return False
         
         logger.info(f"Successfully loaded {len(loaded_docs)} documents into database")
         
-        # Build search indices
-        logger.info("Building search indices...")
-        
-        # Semantic search index
-        logger.info("Building semantic search index...")
-        semantic_service.rebuild_index(loaded_docs)
-        logger.info("Semantic search index built")
-        
-        # Keyword search index
-        logger.info("Building keyword search index...")
-        keyword_service.rebuild_index(loaded_docs)
-        logger.info("Keyword search index built")
+        # Build search indices; they share no state, so encoding and tokenizing overlap
+        logger.info("Building semantic and keyword search indices...")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            semantic_future = executor.submit(semantic_service.rebuild_index, loaded_docs)
+            keyword_future = executor.submit(keyword_service.rebuild_index, loaded_docs)
+            semantic_future.result()
+            logger.info("Semantic search index built")
+            keyword_future.result()
+            logger.info("Keyword search index built")
         
         # Test search functionality
         logger.info("Testing search functionality...")
@@ -114,12 +141,12 @@ def load_sample_data():
             "python programming best practices"
         ]
         
-        for query in test_queries:
-            try:
-                results = hybrid_service.search(query, k=3)
+        # All test queries go through the encoder in one batch
+        for query, results in zip(test_queries, hybrid_service.search_batch(test_queries, k=3)):
+            if 'error' in results:
+                logger.error(f"Error testing query '{query}': {results['error']}")
+            else:
                 logger.info(f"Query '{query}' returned {len(results['results'])} results")
-            except Exception as e:
-                logger.error(f"Error testing query '{query}': {e}")
         
         logger.info("Sample data loading completed successfully!")
         
@@ -148,7 +175,13 @@ def main():
     try:
         mongodb_uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/search_engine')
         test_db = Database(mongodb_uri)
-        test_db.get_all_documents(limit=1)
+        try:
+            # ping reads nothing; only its acknowledgement matters
+            if not test_db.ping():
+                raise RuntimeError("ping was not acknowledged")
+        finally:
+            # The loader opens its own connection pool
+            test_db.close()
         logger.info("MongoDB connection successful")
     except Exception as e:
         logger.error(f"MongoDB connection failed: {e}")
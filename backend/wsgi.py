@@ -0,0 +1,14 @@
+"""WSGI entry point for gunicorn.
+
+app.py is shadowed by the app package on import, so load it by path.
+"""
+import importlib.util
+import os
+
+_spec = importlib.util.spec_from_file_location(
+    'app_factory', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+)
+_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_module)
+
+app = _module.create_app()
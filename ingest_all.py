@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Run every document ingestion script concurrently over one shared HTTP session
+"""
+
+import asyncio
+import logging
+import sys
+
+import add_focused_docs
+import add_long_docs
+import add_sample_docs
+from ingest_utils import gather_or_cancel, install_uvloop, make_session, start_logging, warm_up
+
+log = logging.getLogger(__name__)
+
+async def main():
+    async with make_session() as session:
+        await warm_up(session)
+        counts = await gather_or_cancel(
+            add_focused_docs.run(session),
+            add_long_docs.run(session),
+            add_sample_docs.run(session)
+        )
+    log.info(f"\n✅ Ingested {sum(counts)} documents in total")
+
+if __name__ == "__main__":
+    listener = start_logging()
+    install_uvloop()
+    try:
+        asyncio.run(main())
+    except Exception as e:
+        log.error(f"❌ Ingestion aborted: {e}")
+        sys.exit(1)
+    finally:
+        listener.stop()